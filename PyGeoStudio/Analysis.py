@@ -22,6 +22,7 @@ from prettytable import PrettyTable
 
 from .BasePropertiesClass import BasePropertiesClass
 from .Results import Results
+from .SlopeResults import SlopeResults
 
 
 # Note in the GeoStudioFile, material distribution / BC are defined through a Context element.
@@ -72,6 +73,7 @@ class TimeIncrements(BasePropertiesClass):
     return
   
   def __write__(self, et):
+    if self.__writeSource__(et): return
     for tag,val in self.data.items():
       if tag == "TimeSteps":
         sub = ET.SubElement(et, tag)
@@ -148,6 +150,7 @@ class TimeIncrements(BasePropertiesClass):
       res.append(temp)
     self.data["IncrementCount"] = str(len(timesteps))
     self.data["TimeSteps"] = res
+    self.modified = True
     return
 
 
@@ -176,6 +179,8 @@ class Analysis(BasePropertiesClass):
   :type ExcludeInitDeformation: bool
   :param Results: Interface to analysis results
   :type Results: Results object
+  :param SlopeResults: Interface to the slip surface results (SLOPE/W analyses only)
+  :type SlopeResults: SlopeResults object
   :param TimeIncrements: Timestepping control 
   :type TimeIncrements: TimeIncrements object
   :param ComputedPhysics:
@@ -195,6 +200,7 @@ class Analysis(BasePropertiesClass):
     "Context" : None,
     "ExcludeInitDeformation" : bool,
     "Results": Results,
+    "SlopeResults": SlopeResults,
     "TimeIncrements" : TimeIncrements,
     "ComputedPhysics" : dict,
     "PhysicsOptions" : dict,
@@ -202,7 +208,7 @@ class Analysis(BasePropertiesClass):
 #      "IterationControls" : None,
 #      "UnderRelaxationCriteria" : None,
   }
-  my_data = ["Geometry", "Context", "Results"]
+  my_data = ["Geometry", "Context", "Results", "SlopeResults"]
   
   def __repr__(self):
     res = f"<PyGeoStudio.Analysis object, (ID: {self.data['ID']}, Name: \"{self.data['Name']}\")>"
@@ -217,6 +223,7 @@ class Analysis(BasePropertiesClass):
     """
     self.data["Geometry"] = geom   # pointer toward the geometry, so we can access the geometry defined in this class
     self.data["GeometryID"] = geom.data["ID"]
+    self.modified = True
     return
   
   def setContext(self, context):
@@ -236,7 +243,7 @@ class Analysis(BasePropertiesClass):
     fig,ax = self.data["Geometry"].draw(show=False)
     cmap = plt.get_cmap('tab20', np.max(list(self.data["Context"]["GeometryUsesMaterials"].values())))
     for reg, mat_id in self.data["Context"]["GeometryUsesMaterials"].items():
-      pts = self["Geometry"]["Regions"][reg][0]
+      pts = self["Geometry"].regions[reg][0]
       X_pts = [self["Geometry"]["Points"][x-1,0] for x in pts]
       Y_pts = [self["Geometry"]["Points"][x-1,1] for x in pts]
       ax.fill(X_pts, Y_pts,color=cmap(mat_id-1))
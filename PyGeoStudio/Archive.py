@@ -0,0 +1,289 @@
+# This file is part of PyGeoStudio, an interface to GeoStudio
+# hydrogeotechnical software.
+# Copyright (C) 2024, Moïse Rousseau
+#
+# PyGeoStudio is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PyGeoStudio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import zipfile
+import os
+import struct
+import threading
+
+
+class Archive:
+  """
+  Shared read access to the content of a GeoStudio study (.gsz archive).
+
+  The archive is opened on first access and kept open for the next readers, so the zip central directory is read only once.
+  The state of the study on disk is recorded when the archive is opened, and is checked again only by ``refresh``, not at each access.
+  Saving the study and calling the GeoStudio solver through ``utils.run`` close the archive, so it is reopened on the new study at the next access.
+  Members are indexed per analysis folder, step and file kind, for example ``1 - Initial steady-state/001/node.csv`` is indexed as ``members["1 - Initial steady-state"][1]["node.csv"]``.
+  Files at the root of an analysis folder are stored under the step ``None``, and files at the root of the archive under the folder ``None``.
+
+  :param f_src: Path to the GeoStudio study
+  :type f_src: str
+  """
+  def __init__(self, f_src):
+    self.f_src = f_src
+    self.zip = None
+    self.members = {}
+    self.headers = {}
+    self.stat = None
+    self.lock = threading.RLock()
+    return
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    self.close()
+    return
+
+  def open(self):
+    """
+    Return the opened ``zipfile.ZipFile`` of the study, opening or reopening it if needed.
+
+    :rtype: zipfile.ZipFile
+    """
+    zip_file = self.zip
+    if zip_file is not None:
+      return zip_file
+    with self.lock:
+      if self.zip is None:
+        self.stat = self.__getStat__()
+        self.zip = zipfile.ZipFile(self.f_src, 'r')
+        self.__buildIndex__()
+      return self.zip
+
+  def refresh(self):
+    """
+    Close the archive if the study was modified on disk since it was opened (e.g. by the GeoStudio solver called outside PyGeoStudio), so it is reopened at the next access.
+
+    :return: True if the study was modified
+    :rtype: bool
+    """
+    with self.lock:
+      if self.zip is None or self.__getStat__() == self.stat:
+        return False
+      self.close()
+    return True
+
+  def __getStat__(self):
+    """
+    Return the modification time and size of the study on disk.
+
+    :meta private:
+    """
+    stat = os.stat(self.f_src)
+    return (stat.st_mtime_ns, stat.st_size)
+
+  def close(self):
+    """
+    Close the archive. It will be reopened at the next access.
+    """
+    with self.lock:
+      if self.zip is not None:
+        self.zip.close()
+      self.zip = None
+      self.stat = None
+      self.members = {}
+      self.headers = {}
+    return
+
+  def __buildIndex__(self):
+    for name in self.zip.namelist():
+      path = name.split('/')
+      folder, step, kind = None, None, path[-1]
+      if len(path) > 1:
+        folder = path[0]
+      if len(path) > 2 and path[1].isdigit():
+        step = int(path[1])
+      self.members.setdefault(folder, {}).setdefault(step, {})[kind] = name
+    return
+
+  def namelist(self):
+    """
+    Return the name of all the members in the archive.
+    """
+    return self.open().namelist()
+
+  def getMember(self, folder, step, kind):
+    """
+    Return the name of a member in the archive, or ``None`` if it does not exist.
+
+    :param folder: Analysis folder in the archive (``None`` for the archive root)
+    :type folder: str
+    :param step: Step of the analysis (``None`` for the analysis folder root)
+    :type step: int
+    :param kind: Name of the file (e.g. ``node.csv``)
+    :type kind: str
+    """
+    self.open()
+    return self.members.get(folder, {}).get(step, {}).get(kind)
+
+  def getSteps(self, folder, kind):
+    """
+    Return the sorted steps of an analysis folder containing a given kind of file.
+
+    :param folder: Analysis folder in the archive
+    :type folder: str
+    :param kind: Name of the file (e.g. ``node.csv``)
+    :type kind: str
+    :rtype: list of int
+    """
+    self.open()
+    steps = self.members.get(folder, {})
+    return sorted([x for x in steps.keys() if x is not None and kind in steps[x]])
+
+  def getInfo(self, name):
+    """
+    Return the information of a member of the archive (size, CRC, ...).
+
+    :param name: Name of the member
+    :type name: str
+    :rtype: zipfile.ZipInfo
+    """
+    return self.open().getinfo(name)
+
+  def getMemberKey(self, name):
+    """
+    Return a key identifying the content of a member, built from its CRC and size.
+
+    :param name: Name of the member
+    :type name: str
+    :rtype: str
+    """
+    info = self.getInfo(name)
+    return f"{info.CRC:08x}_{info.file_size}"
+
+  def read(self, name):
+    """
+    Return the content of a member of the archive.
+
+    :param name: Name of the member
+    :type name: str
+    :rtype: bytes
+    """
+    return self.open().read(name)
+
+  def openMember(self, name):
+    """
+    Open a member of the archive in binary read mode.
+
+    :param name: Name of the member
+    :type name: str
+    :rtype: file object
+    """
+    return self.open().open(name, 'r')
+
+  def getHeader(self, name):
+    """
+    Return the header of a CSV member as a list of column names. Headers are cached until the archive is reopened.
+
+    :param name: Name of the member
+    :type name: str
+    :rtype: list of str
+    """
+    self.open()
+    header = self.headers.get(name)
+    if header is None:
+      with self.openMember(name) as f:
+        header = f.readline().decode().rstrip().split(',')
+      self.headers[name] = header
+    return list(header)
+
+  def copyMembers(self, zip_out, names):
+    """
+    Copy members of the archive to another archive opened in write mode, without decompressing and recompressing them.
+
+    :param zip_out: The output archive
+    :type zip_out: zipfile.ZipFile
+    :param names: Name of the members to copy
+    :type names: list of str
+    """
+    src = self.open()
+    if not canWriteRawMember(zip_out):
+      for name in names: #decompress and recompress
+        zinfo = src.getinfo(name)
+        zip_out.writestr(copyZipInfo(zinfo), src.read(name))
+      return
+    with open(self.f_src, 'rb') as raw:
+      for name in names:
+        zinfo = src.getinfo(name)
+        raw.seek(zinfo.header_offset)
+        header = struct.unpack(zipfile.structFileHeader, raw.read(zipfile.sizeFileHeader))
+        raw.seek(header[10] + header[11], os.SEEK_CUR) #skip file name and extra field
+        writeRawMember(zip_out, zinfo, raw)
+    return
+
+
+ZIPFILE_INTERNALS = ["_lock", "_seekable", "start_dir", "_writecheck", "_didModify", "fp", "filelist", "NameToInfo"]
+
+def canWriteRawMember(zip_out):
+  """
+  Check if the zipfile internals used by ``writeRawMember`` are available in this Python version.
+
+  :meta private:
+  """
+  return all([hasattr(zip_out, x) for x in ZIPFILE_INTERNALS]) and hasattr(zipfile.ZipInfo, "FileHeader")
+
+def copyZipInfo(zinfo):
+  """
+  Return a new ZipInfo with the name, date, compression and attributes of a member of another archive.
+
+  :meta private:
+  """
+  zi = zipfile.ZipInfo(zinfo.filename, zinfo.date_time)
+  zi.compress_type = zinfo.compress_type
+  zi.external_attr = zinfo.external_attr
+  zi.create_system = zinfo.create_system
+  return zi
+
+def writeRawMember(zip_out, zinfo, raw, chunk_size=2**20):
+  """
+  Write an already compressed member in a zip archive opened in write mode.
+  zipfile has no public API for this, so the member is appended the same way ``ZipFile.writestr`` does, using zipfile internals.
+  ``Archive.copyMembers`` falls back to ``ZipFile.writestr`` if these internals are missing (see ``canWriteRawMember``), and the round trip is checked by the test suite.
+
+  :param zip_out: The output archive
+  :type zip_out: zipfile.ZipFile
+  :param zinfo: Information of the member in the source archive (name, CRC, sizes, compression)
+  :type zinfo: zipfile.ZipInfo
+  :param raw: File positioned at the start of the compressed data of the member
+  :type raw: file object
+  """
+  zi = copyZipInfo(zinfo)
+  zi.CRC = zinfo.CRC
+  zi.compress_size = zinfo.compress_size
+  zi.file_size = zinfo.file_size
+  zi.flag_bits = zinfo.flag_bits & ~0x08 #sizes are known, no data descriptor after the data
+  zip64 = zi.file_size > zipfile.ZIP64_LIMIT or zi.compress_size > zipfile.ZIP64_LIMIT
+  with zip_out._lock:
+    if zip_out._seekable:
+      zip_out.fp.seek(zip_out.start_dir)
+    zip_out._writecheck(zi)
+    zip_out._didModify = True
+    zi.header_offset = zip_out.fp.tell()
+    zip_out.fp.write(zi.FileHeader(zip64))
+    remaining = zi.compress_size
+    while remaining > 0:
+      data = raw.read(min(chunk_size, remaining))
+      if not data:
+        raise IOError(f"Unexpected end of file while copying {zi.filename}")
+      zip_out.fp.write(data)
+      remaining -= len(data)
+    zip_out.filelist.append(zi)
+    zip_out.NameToInfo[zi.filename] = zi
+    zip_out.start_dir = zip_out.fp.tell()
+  return
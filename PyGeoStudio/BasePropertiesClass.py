@@ -30,12 +30,19 @@ class BasePropertiesClass:
   * my_data: list of properties only defined in PyGeoStudio for more intuitive interfacing
 
   In parameter_type, if the value is dict, it is written as a attrib
+
+  The XML element the object was read from is kept in source. If the object was not modified since,
+  it is written back as is instead of being serialized again.
+  Values returned as mutable objects (list, raw XML tree, ...) could be modified in place without PyGeoStudio knowing,
+  so the object is then considered as modified.
   """
   parameter_type = {}
   my_data = []
   def __init__(self, prop=None):
     self.data = {}
     self.other_elem = []
+    self.source = prop
+    self.modified = False
     if prop is not None:
       self.read(prop)
     return
@@ -55,6 +62,7 @@ class BasePropertiesClass:
     if property_ in self.my_data: #do not interpret the property defined in my_data
       self.data[property_] = val
       return
+    self.modified = True
     if property_ not in self.data.keys():
       if property_ not in self.parameter_type.keys():
         raise ValueError(f"Property {property_} not defined in PyGeoStudio. If you feel this is an error, please contact for assistance.")
@@ -69,21 +77,24 @@ class BasePropertiesClass:
     Return the property.
     """
     if property_ in self.data.keys(): #return to the user
-      if property_ in self.parameter_type.keys(): # already seen and handled but PyGeoStudio
+      if property_ in self.my_data:
+        return self.data[property_]
+      elif property_ in self.parameter_type.keys(): # already seen and handled but PyGeoStudio
         func = self.parameter_type[property_]
         if func in [dict, int, str, float, bool]: #Convert to standard Python object
           return func(self.data[property_])
         else: #returned the PyGeoStudio object
+          if not hasattr(self.data[property_], "isModified"): self.modified = True
           return self.data[property_]
-      elif property_ in self.my_data:
-        return self.data[property_]
       else: #not handled
         warnings.warn(f"Property {property_} defined but not officially handled by PyGeoStudio.\nReturn property non-interpreted as a string. Please contact for assistance.", UserWarning)
+        if not isinstance(self.data[property_], str): self.modified = True #could be modified in place
         return self.data[property_]
     elif property_ in self.parameter_type.keys(): #not defined in the analysis but PyGeoStudio knows it
       return None
     elif property_ in [x.tag for x in self.other_elem]:
       warnings.warn(f"Property named \"{property_}\" defined, but it has a complex structure not yet handled by PyGeoStudio. Return it as a raw XML tree. Good luck or please contact for assistance.")
+      self.modified = True
       for x in self.other_elem:
         if x.tag == property_: return x
     else: #totally unknown
@@ -129,10 +140,38 @@ class BasePropertiesClass:
     self.__initialize__()
     return
 
+  def isModified(self):
+    """
+    Return True if the object (or one of the object it contains) was modified since it was read.
+    """
+    if self.modified or self.source is None:
+      return True
+    for tag,val in self.data.items():
+      if tag in self.my_data: continue
+      if hasattr(val, "isModified") and val.isModified():
+        return True
+    return False
+
+  def __writeSource__(self, et):
+    """
+    Copy the XML element the object was read from in et if the object was not modified.
+    Return True if the source was written.
+
+    :meta private:
+    """
+    if self.isModified():
+      return False
+    et.attrib.update(self.source.attrib)
+    et.text = self.source.text
+    et.extend(self.source)
+    return True
+
   def __write__(self, et):
     """
     Write back the properties in an XML Tree to save the GeoStudio file
     """
+    if self.__writeSource__(et): return
+    data = self.data.copy()
     self.__deinitialize__()
     for tag,val in self.data.items():
       if tag in self.my_data: continue #skip property defined in this lib
@@ -156,7 +195,7 @@ class BasePropertiesClass:
       sub.text = val
     for prop in self.other_elem:
       et.append(prop)
-    self.__initialize__()
+    self.data = data #restore the processed attributes
     return
 
   def __initialize__(self):
@@ -176,6 +215,7 @@ class BasePropertiesClass:
     Return a dictionnary holding all the properties of the class.
     Note: you should know what to do when changing manually these properties.
     """
+    self.modified = True
     return self.data
 
   def showAvailableProperties(self):
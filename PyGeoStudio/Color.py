@@ -37,7 +37,14 @@ class Color:
       self.rgb = arg
     else:
       raise ValueError(f"Can't set color from {arg}, try a nammed color from Matplotlib CSS4 colors (see `here <https://matplotlib.org/stable/gallery/color/named_colors.html#css-colors>`_) or with a RGB list.")
+    self.source_rgb = list(self.rgb) if isinstance(arg, ET.Element) else None
     return
+
+  def isModified(self):
+    """
+    Return True if the color was changed since it was read.
+    """
+    return self.rgb != self.source_rgb
   
   def setMPLColor(self, color):
     """
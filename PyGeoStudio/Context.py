@@ -66,6 +66,7 @@ class Context(BasePropertiesClass):
     return
 
   def __write__(self, et):
+    if self.__writeSource__(et): return
     #analysis ID
     for tag,val in self.data.items():
       if tag == "GeometryUsesMaterials":
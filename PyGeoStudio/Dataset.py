@@ -18,16 +18,23 @@
 from .BasePropertiesClass import BasePropertiesClass
 import numpy as np
 import xml.etree.ElementTree as ET
-import zipfile
+
+from .Archive import Archive
+from .csv_reader import readCsv
 
 class DatasetParameters:
   def __init__(self, prop=None):
     if prop is None:
       self.params = []
+      self.source_params = None
     else:
       self.params = [param.text for param in prop]
+      self.source_params = list(self.params)
     return
 
+  def isModified(self):
+    return self.params != self.source_params
+
   def __write__(self, et):
     et.attrib = {"Len":str(len(self.params))}
     for p in self.params:
@@ -81,11 +88,11 @@ class Dataset(BasePropertiesClass):
   def __init__(self, prop=None, f_src=None):
     super().__init__(prop)
     if f_src is not None:
-      src = zipfile.ZipFile(f_src)
-      res = src.open(f"dataset_{self.data['CsvID']}.csv", 'r')
-      self.data["Data"] = np.genfromtxt(res, delimiter=',', skip_header=1)[:,1:]
+      src = f_src if isinstance(f_src, Archive) else Archive(f_src)
+      res = src.openMember(f"dataset_{self.data['CsvID']}.csv")
+      self.data["Data"] = readCsv(res)[2]
       res.close()
-      src.close()
+      if src is not f_src: src.close()
     return
 
   def loadDataFromCSV(self, path, delimiter=",", comments="#"):
@@ -98,6 +105,7 @@ class Dataset(BasePropertiesClass):
     self.data["FilePath"] = path
     self.data["Data"] = np.genfromtxt(path,comments=comments, delimiter=delimiter)
     self.data["NumRows"] = str(self.data["Data"].shape[0])
+    self.modified = True
     return
 
   def loadDataFromArray(self, arr):
@@ -109,6 +117,7 @@ class Dataset(BasePropertiesClass):
     """
     self.data["Data"] = arr
     self.data["NumRows"] = str(arr.shape[0])
+    self.modified = True
     return
 
   def setDataParameters(self, params):
@@ -139,7 +148,9 @@ class Dataset(BasePropertiesClass):
 
   def getData(self):
     """
-    Return the data stored in the dataset
+    Return the data stored in the dataset.
+    The array could be modified in place, so the dataset is then considered as modified.
     """
+    self.modified = True
     return self.data["Data"]
 
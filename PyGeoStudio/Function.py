@@ -52,9 +52,22 @@ class Function(BasePropertiesClass):
       return self.fun_options
     elif property_ == "FunctionType":
       return self.fun_type
+    elif property_ == "Points": #changes are tracked by comparison with the points read
+      return self.data.get("Points")
     else:
       return super().__getitem__(property_)
 
+  def isModified(self):
+    """
+    Return True if the function was modified since it was read.
+    """
+    if super().isModified():
+      return True
+    points = self.data.get("Points")
+    if points is None or self.source_points is None:
+      return points is not self.source_points
+    return not np.array_equal(points, self.source_points)
+
   def plot(self):
     """
     Plot the function data using matplotlib
@@ -125,6 +138,7 @@ class Function(BasePropertiesClass):
   def __initialize__(self):
     if self.data.get("Points") is not None:
       self.data["Points"] = np.array( [ [float(y) for y in x[1].values()] for x in self.data["Points"] ] )
+    self.source_points = None if self.data.get("Points") is None else self.data["Points"].copy()
     options = [ x.split('=') for x in self.data["Function"].split('(')[-1][:-1].split(',') ]
     self.fun_options = {x[0] : x[1] for x in options }
     self.fun_type = self.data["Function"].split('(')[0]
@@ -41,16 +41,35 @@ class Geometry:
     self.points = None
     self.lines = None
     self.mesh_id = None
-    self.mesh = None
+    self.mesh_object = None
+    self.mesh_loader = None #function reading the mesh at first access
     self.name = None
     self.regions = {}
     self.other_elem = []
+    self.source = None #XML element read, written back as is if the geometry was not modified
+    self.source_points = None
+    self.source_lines = None
+    self.modified = False
     return
+
+  @property
+  def mesh(self):
+    if self.mesh_object is None and self.mesh_loader is not None:
+      self.mesh_object = self.mesh_loader(self)
+      self.mesh_loader = None
+    return self.mesh_object
+
+  @mesh.setter
+  def mesh(self, mesh):
+    self.mesh_object = mesh
+    self.mesh_loader = None
   
   def __getitem__(self, parameter):
     if parameter == "Points": return self.points
     elif parameter == "Lines": return self.lines
-    elif parameter == "Regions": return self.regions
+    elif parameter == "Regions":
+      self.modified = True #regions could be modified in place
+      return self.regions
     elif parameter == "MeshId": return None if self.mesh_id is None else int(self.mesh_id)
     elif parameter == "Mesh": return self.mesh
     elif parameter == "Name": return self.name
@@ -84,7 +103,21 @@ class Geometry:
       plt.show()
     return fig,ax
   
+  def isModified(self):
+    """
+    Return True if the geometry was modified since it was read.
+    """
+    if self.modified or self.source is None:
+      return True
+    for arr, ref in [(self.points, self.source_points), (self.lines, self.source_lines)]:
+      if arr is None or ref is None:
+        if arr is not ref: return True
+      elif not np.array_equal(arr, ref):
+        return True
+    return False
+
   def read(self, element):
+    self.source = element
     for property_ in element:
       if property_.tag == "Points":
         self.points = np.zeros((int(property_.attrib["Len"]),2),dtype='f8')
@@ -115,6 +148,8 @@ class Geometry:
       #  pass
       else:
         self.other_elem.append(property_)
+    self.source_points = None if self.points is None else self.points.copy()
+    self.source_lines = None if self.lines is None else self.lines.copy()
     return
   
   def createRegion(self, pts):
@@ -132,6 +167,7 @@ class Geometry:
     self.add_lines(new_lines)
     new_region = [x+n_pts_ini+1 for x in range(len(pts))]
     self.add_regions(new_region)
+    self.modified = True
     return
   
   def addPoints(self, pts):
@@ -142,6 +178,7 @@ class Geometry:
     :type pt: numpy array or list of list
     """
     self.points = np.append(self.points, pts)
+    self.modified = True
     return
     
   def addLines(self, lines):
@@ -152,6 +189,7 @@ class Geometry:
     :type lines: numpy array or list of list
     """
     self.lines = np.append(self.lines, new_lines)
+    self.modified = True
     return
   
   def addRegions(self, pt_ids):
@@ -164,9 +202,15 @@ class Geometry:
     new_id = len(self.regions) + 1
     new_reg = [pt_ids, []]
     self.regions[f"Regions-{new_id}"] = new_reg
+    self.modified = True
     return
   
   def __write__(self, et):
+    if not self.isModified():
+      et.attrib.update(self.source.attrib)
+      et.text = self.source.text
+      et.extend(self.source)
+      return
     #points
     sub = ET.SubElement(et, "Points")
     sub.attrib = {"Len":str(len(self.points))}
@@ -116,6 +116,7 @@ class MaterialHydraulicFunction(BasePropertiesClass):
     """
     Custom write function to write properties as an attribute.
     """
+    if self.__writeSource__(sub): return
     sub.attrib = {x:y for x,y in self.data.items() if x not in self.my_data}
     return
 
@@ -140,6 +141,7 @@ class MaterialThermalFunction(BasePropertiesClass):
     return
 
   def __write__(self, sub):
+    if self.__writeSource__(sub): return
     sub.attrib = {x:y for x,y in self.data.items() if x not in self.my_data}
     return
 
@@ -193,10 +195,10 @@ class Material(BasePropertiesClass):
     :param Ksat: The new saturated hydraulic conductivity
     :type Ksat: float
     """
-    if self["SeepModel"] == "Sat-Unsat":
+    if self["SeepModel"] in ["SatUnsat", "Sat-Unsat"]:
       Kfunction = self["Hydraulic"]["KFn"]
       actual_relK = Kfunction.getYData()
-      Kfunction.setYData(new_Ksat/actual_relK[0] * actual_relK)
+      Kfunction.setYData(Ksat/actual_relK[0] * actual_relK)
     else:
-      self["SeepModel"]["Ksat"] = Ksat
+      self["Hydraulic"]["KSat"] = Ksat
     return
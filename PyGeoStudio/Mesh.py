@@ -17,6 +17,8 @@
 
 import plyfile
 import numpy as np
+import os
+import tempfile
 import xml.etree.ElementTree as ET
 import matplotlib.pyplot as plt
 import warnings
@@ -30,14 +32,123 @@ class Mesh:
   :type Vertices: numpy array
   :param Elements: list of mesh vertices defining the mesh elements
   :type Elements: list
+
+  Element connectivity is also stored as flat arrays built on load:
+  nodes of element ``i`` are ``element_nodes[element_offsets[i]:element_offsets[i+1]]`` (0 based),
+  and ``triangles`` / ``quads`` hold the nodes of the triangle and quadrilateral elements with their index in ``elements`` in ``triangle_index`` / ``quad_index``.
+
+  The parsed points and connectivity can be stored in a cache directory as ``.npy`` files under a key identifying the PLY content (e.g. its CRC in the study).
+  When the key is found in the cache, the PLY file is not parsed. It is then only read if ``mesh``, ``vertices`` or ``elements`` are accessed.
+
+  :param mesh_id: Index of the mesh
+  :type mesh_id: int
+  :param src_mesh: The PLY mesh file opened in binary mode, or a function returning it
+  :type src_mesh: file object or callable
+  :param cache_dir: Directory of the parsed mesh cache (optional, default no cache)
+  :type cache_dir: str
+  :param cache_key: Key of the mesh in the cache, required to use the cache
+  :type cache_key: str
   """
-  def __init__(self, mesh_id, src_mesh):
+  cached_arrays = ["points", "element_offsets", "element_nodes"]
+
+  def __init__(self, mesh_id, src_mesh, cache_dir=None, cache_key=None):
     self.mesh_id = mesh_id
-    self.mesh = plyfile.PlyData.read(src_mesh)
-    self.vertices = self.mesh['node']
-    self.elements = self.mesh['element']['id']
+    self.src_mesh = src_mesh
+    self.ply = None
+    cache_path = None
+    if cache_dir is not None and cache_key is not None:
+      cache_path = os.path.join(cache_dir, cache_key)
+    if cache_path is None or not self.__readCache__(cache_path):
+      self.points = np.array([self.vertices['x'], self.vertices['y'], self.vertices['z']], dtype='f8').transpose()
+      self.__buildConnectivity__()
+      if cache_path is not None:
+        self.__writeCache__(cache_path)
+    self.__buildCells__()
+    self.meshio_data = None #cached conversion to MeshIO points and cells
+    self.resetSpatialIndex()
+    return
+
+  def resetSpatialIndex(self):
+    """
+    Discard the search structures built from the mesh points (bounding box, KD-tree and element grid). They are rebuilt at the next search.
+    Call this method if the points of the mesh are modified.
+    """
+    self.bounding_box = None #(min point, max point, diagonal length), computed at the first use
+    self.spatial_index = None #built at the first nearest node search
+    self.element_grid = None #built at the first point location in elements
     return
   
+  @property
+  def mesh(self):
+    if self.ply is None:
+      src = self.src_mesh() if callable(self.src_mesh) else self.src_mesh
+      self.ply = plyfile.PlyData.read(src)
+      self.src_mesh = None
+    return self.ply
+
+  @property
+  def vertices(self):
+    return self.mesh['node']
+
+  @property
+  def elements(self):
+    return self.mesh['element']['id']
+
+  def __readCache__(self, path):
+    """
+    Read the parsed arrays from the cache. Return False if they are not in the cache.
+    
+    :meta private:
+    """
+    files = [os.path.join(path, f"{x}.npy") for x in self.cached_arrays]
+    if not all([os.path.isfile(x) for x in files]):
+      return False
+    for name, f in zip(self.cached_arrays, files):
+      setattr(self, name, np.load(f))
+    return True
+
+  def __writeCache__(self, path):
+    """
+    Write the parsed arrays in the cache. Files are written under a temporary name then renamed, so concurrent readers never see partial files.
+    
+    :meta private:
+    """
+    os.makedirs(path, exist_ok=True)
+    for name in self.cached_arrays:
+      fd, f_tmp = tempfile.mkstemp(suffix=".npy", dir=path)
+      with os.fdopen(fd, 'wb') as f:
+        np.save(f, getattr(self, name))
+      os.replace(f_tmp, os.path.join(path, f"{name}.npy"))
+    return
+
+  def __buildConnectivity__(self):
+    """
+    Build the CSR connectivity arrays from the PLY element list.
+    
+    :meta private:
+    """
+    sizes = np.fromiter((len(x) for x in self.elements), dtype='i8', count=len(self.elements))
+    self.element_offsets = np.zeros(len(sizes)+1, dtype='i8')
+    np.cumsum(sizes, out=self.element_offsets[1:])
+    if len(self.elements):
+      self.element_nodes = np.concatenate(self.elements).astype('i8') - 1
+    else:
+      self.element_nodes = np.zeros(0, dtype='i8')
+    return
+
+  def __buildCells__(self):
+    """
+    Build the dense triangle and quadrilateral connectivity arrays from the CSR arrays.
+    
+    :meta private:
+    """
+    sizes = np.diff(self.element_offsets)
+    self.triangle_index = np.flatnonzero(sizes == 3)
+    self.quad_index = np.flatnonzero(sizes == 4)
+    self.triangles = self.element_nodes[self.element_offsets[self.triangle_index,None] + np.arange(3)]
+    self.quads = self.element_nodes[self.element_offsets[self.quad_index,None] + np.arange(4)]
+    return
+
   def getMeshBoundingBox(self):
     """
     Return the two points of the diagonal of the mesh bounding box
@@ -45,33 +156,204 @@ class Mesh:
     :return: Coordinate of the most bottom front left and most top rear right points of the mesh
     :rtype: list
     """
-    min_point = [np.min(self.vertices['x']), np.min(self.vertices['y']), np.min(self.vertices['z'])]
-    max_point = [np.max(self.vertices['x']), np.max(self.vertices['y']), np.max(self.vertices['z'])]
-    return min_point, max_point
+    min_point, max_point, diag = self.__getBoundingBox__()
+    return list(min_point), list(max_point)
+
+  def __getBoundingBox__(self):
+    """
+    Return the min and max points of the mesh bounding box and the length of its diagonal, computed once.
+
+    :meta private:
+    """
+    if self.bounding_box is None:
+      min_point = np.min(self.points, axis=0)
+      max_point = np.max(self.points, axis=0)
+      self.bounding_box = (min_point, max_point, float(np.sqrt(np.sum((max_point-min_point)**2))))
+    return self.bounding_box
   
   def getPointIndexInMesh(self, location):
     """
     Return point index closest to the location given.
     
-    :param location: [X,Y,Z] coordinate of the location
+    :param location: [X,Y] or [X,Y,Z] coordinate of the location
     :type location: Iterable
     :return: Index of the point in the mesh (0 based)
     :rtype: int
     """
-    X,Y = location
-    Z = 0.
-    vertices = self.vertices
-    domain_diag = (np.min(vertices['x'])-np.max(vertices['x']))**2 + \
-                   (np.min(vertices['y'])-np.max(vertices['y']))**2 + \
-                   (np.min(vertices['z'])-np.max(vertices['z']))**2 
-    distance = (X-vertices['x'])**2 + \
-                  (Y-vertices['y'])**2 + \
-                  (Z-vertices['z'])**2
-    champion = np.argmin(distance)
-    if distance[champion] > 0.01 * domain_diag:
-      warnings.warn(f"Warning, point {[X,Y,Z]} located at a relatively high distance from a mesh point: {np.sqrt(distance):.6e} / Domain bounding box diagonal {np.sqrt(domain_diag):.6e}", UserWarning)
-    return champion
+    indices, distances = self.getPointIndicesInMesh([location])
+    return indices[0]
+
+  def getPointIndicesInMesh(self, locations):
+    """
+    Return the indices of the points closest to the locations given and their distances.
+    The search uses a KD-tree if SciPy is installed, else a brute force search vectorized with NumPy.
+    The search structure is built at the first call and reused for the next ones.
+    
+    :param locations: [X,Y] or [X,Y,Z] coordinates of the locations (Z is taken as 0 if not given)
+    :type locations: numpy array or list of list
+    :return: Index of the closest point in the mesh (0 based) and distance to this point for each location
+    :rtype: numpy array (int), numpy array (float)
+    """
+    locations = np.atleast_2d(np.asarray(locations, dtype='f8'))
+    if locations.shape[1] == 2:
+      locations = np.append(locations, np.zeros((len(locations),1)), axis=1)
+    spatial_index = self.__getSpatialIndex__()
+    if spatial_index is not None:
+      distances, indices = spatial_index.query(locations)
+    else:
+      indices, distances = self.__bruteForceNearest__(locations)
+    domain_diag = self.__getBoundingBox__()[2]
+    far = distances > 0.1 * domain_diag
+    if np.any(far):
+      warnings.warn(f"Warning, points {locations[far].tolist()} located at a relatively high distance from a mesh point: {distances[far].tolist()} / Domain bounding box diagonal {domain_diag:.6e}", UserWarning)
+    return np.asarray(indices, dtype='i8'), distances
+
+  def __getSpatialIndex__(self):
+    """
+    Return the KD-tree of the mesh points, or None if SciPy is not available.
+    
+    :meta private:
+    """
+    if self.spatial_index is None:
+      try:
+        from scipy.spatial import cKDTree
+      except ImportError:
+        return None
+      self.spatial_index = cKDTree(self.points)
+    return self.spatial_index
+
+  def __bruteForceNearest__(self, locations, max_size=2**22):
+    """
+    Nearest point search computing the distances by chunks of locations so the distance matrix stay below max_size elements.
+    
+    :meta private:
+    """
+    indices = np.zeros(len(locations), dtype='i8')
+    distances = np.zeros(len(locations), dtype='f8')
+    chunk = max(1, max_size // max(1, len(self.points)))
+    for start in range(0, len(locations), chunk):
+      d = np.sum((locations[start:start+chunk,None,:] - self.points[None,:,:])**2, axis=2)
+      indices[start:start+chunk] = np.argmin(d, axis=1)
+      distances[start:start+chunk] = np.sqrt(d[np.arange(len(d)),indices[start:start+chunk]])
+    return indices, distances
   
+  def getElementIndicesInMesh(self, locations):
+    """
+    Return the index of the triangle or quadrilateral element containing each location given.
+    
+    :param locations: [X,Y] coordinates of the locations
+    :type locations: numpy array or list of list
+    :return: Index of the element in ``elements`` (0 based) containing the location, -1 if the location is outside the mesh
+    :rtype: numpy array (int)
+    """
+    elements, nodes, weights = self.__locatePoints__(locations)
+    return elements
+
+  def getInterpolationWeights(self, locations):
+    """
+    Return the nodes and the shape function values (linear for triangle, bilinear for quadrilateral) to interpolate nodal values at the locations given.
+    Values at the locations are then given by ``np.sum(values[nodes] * weights, axis=1)``.
+    
+    :param locations: [X,Y] coordinates of the locations
+    :type locations: numpy array or list of list
+    :return: Index of the element containing the location (-1 if outside the mesh), index of the element nodes (0 based) and their weights with shape ``(n_locations, 4)``. Locations outside the mesh have zero weights.
+    :rtype: numpy array (int), numpy array (int), numpy array (float)
+    """
+    return self.__locatePoints__(locations)
+
+  def __getCells__(self):
+    """
+    Return the node indices (0 based) of the triangle and quadrilateral elements as an array of shape ``(n, 4)`` (the last node of triangles is -1) and the index of these elements in ``elements``.
+    
+    :meta private:
+    """
+    index = np.append(self.triangle_index, self.quad_index)
+    cells = np.full((len(index),4), -1, dtype='i8')
+    cells[:len(self.triangles),:3] = self.triangles
+    cells[len(self.triangles):] = self.quads
+    return cells, index
+
+  def __getElementGrid__(self):
+    """
+    Build a regular grid over the mesh where each grid cell list the elements whose bounding box overlaps it.
+    
+    :meta private:
+    """
+    if self.element_grid is not None:
+      return self.element_grid
+    cells, index = self.__getCells__()
+    xy = self.points[:,:2]
+    corners = np.where(cells < 0, cells[:,:1], cells)
+    cx, cy = xy[corners,0], xy[corners,1]
+    bb_min = np.array([cx.min(axis=1), cy.min(axis=1)]).transpose()
+    bb_max = np.array([cx.max(axis=1), cy.max(axis=1)]).transpose()
+    min_point, max_point, diag = self.__getBoundingBox__()
+    origin = min_point[:2]
+    extent = np.maximum(max_point[:2] - origin, 1e-12)
+    h = max(np.sqrt(extent[0] * extent[1] / max(len(cells),1)), 1e-12) #about one element per grid cell
+    shape = np.ceil(extent / h).astype('i8') + 1
+    i_min = np.clip(np.floor((bb_min - origin) / h).astype('i8'), 0, shape-1)
+    i_max = np.clip(np.floor((bb_max - origin) / h).astype('i8'), 0, shape-1)
+    # list all (grid cell, element) pairs
+    n_x = i_max[:,0] - i_min[:,0] + 1
+    n_y = i_max[:,1] - i_min[:,1] + 1
+    count = n_x * n_y
+    elem = np.repeat(np.arange(len(cells)), count)
+    local = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+    gx = i_min[elem,0] + local // n_y[elem]
+    gy = i_min[elem,1] + local % n_y[elem]
+    grid_id = gx * shape[1] + gy
+    order = np.argsort(grid_id, kind="stable")
+    start = np.zeros(shape[0]*shape[1]+1, dtype='i8')
+    start[1:] = np.cumsum(np.bincount(grid_id, minlength=shape[0]*shape[1]))
+    self.element_grid = {
+      "origin" : origin, "h" : h, "shape" : shape,
+      "start" : start, "elements" : elem[order],
+      "cells" : cells, "index" : index,
+    }
+    return self.element_grid
+
+  def __locatePoints__(self, locations, tol=1e-9):
+    """
+    Find the element containing the locations and the shape functions values at the locations.
+    
+    :meta private:
+    """
+    locations = np.atleast_2d(np.asarray(locations, dtype='f8'))[:,:2]
+    grid = self.__getElementGrid__()
+    cells = grid["cells"]
+    xy = self.points[:,:2]
+    n = len(locations)
+    # candidate elements from the grid cell of each location
+    g = np.floor((locations - grid["origin"]) / grid["h"]).astype('i8')
+    valid = np.all((g >= 0) & (g < grid["shape"]), axis=1)
+    grid_id = np.where(valid, g[:,0] * grid["shape"][1] + g[:,1], 0)
+    n_cand = np.where(valid, grid["start"][grid_id+1] - grid["start"][grid_id], 0)
+    pt = np.repeat(np.arange(n), n_cand)
+    cand = grid["elements"][
+      np.arange(n_cand.sum()) - np.repeat(np.cumsum(n_cand) - n_cand, n_cand) + np.repeat(grid["start"][grid_id], n_cand)
+    ]
+    # local coordinates and shape functions of the candidates
+    weights = np.zeros((len(cand),4), dtype='f8')
+    inside = np.zeros(len(cand), dtype=bool)
+    is_tri = cells[cand,3] < 0
+    tri, quad = np.flatnonzero(is_tri), np.flatnonzero(~is_tri)
+    if len(tri):
+      weights[tri,:3], inside[tri] = triangleShapeFunctions(xy[cells[cand[tri],:3]], locations[pt[tri]], tol)
+    if len(quad):
+      weights[quad], inside[quad] = quadShapeFunctions(xy[cells[cand[quad]]], locations[pt[quad]], tol)
+    # keep the first element found for each location
+    found = np.flatnonzero(inside)
+    pts_found, first = np.unique(pt[found], return_index=True)
+    first = found[first]
+    elements = np.full(n, -1, dtype='i8')
+    nodes = np.zeros((n,4), dtype='i8')
+    out_weights = np.zeros((n,4), dtype='f8')
+    elements[pts_found] = grid["index"][cand[first]]
+    nodes[pts_found] = np.maximum(cells[cand[first]], 0)
+    out_weights[pts_found] = weights[first]
+    return elements, nodes, out_weights
+
   def asMeshIOData(self):
     """
     Convert Mesh data into MeshIO format points and cells: 
@@ -84,15 +366,13 @@ class Mesh:
     :return: Points and Cells in MeshIO suitable format.
     :rtype: numpy array, list
     """
-    x = self.vertices['x']
-    y = self.vertices['y']
-    z = self.vertices['z']
-    points = np.array([x,y,z]).transpose()
-    cells = [
-      ("triangle", [x-1 for x in self.elements if len(x) == 3]),
-      ("quad", [x-1 for x in self.elements if len(x) == 4])
-    ]
-    return points, cells
+    if self.meshio_data is None:
+      cells = [
+        ("triangle", self.triangles),
+        ("quad", self.quads),
+      ]
+      self.meshio_data = (self.points, cells)
+    return self.meshio_data
 
   def write(self, path):
     """
@@ -127,3 +407,61 @@ class Mesh:
     mesh.write(path)
     return
 
+
+
+def triangleShapeFunctions(vertices, locations, tol=1e-9):
+  """
+  Compute the linear shape functions of triangles at the given locations.
+  
+  :param vertices: XY coordinates of the triangle vertices with shape ``(n, 3, 2)``
+  :type vertices: numpy array
+  :param locations: XY coordinates of the locations with shape ``(n, 2)``
+  :type locations: numpy array
+  :return: Shape function values with shape ``(n, 3)`` and if the location is inside the triangle
+  :rtype: numpy array (float), numpy array (bool)
+  """
+  e1 = vertices[:,1] - vertices[:,0]
+  e2 = vertices[:,2] - vertices[:,0]
+  r = locations - vertices[:,0]
+  det = e1[:,0] * e2[:,1] - e1[:,1] * e2[:,0]
+  det = np.where(det == 0., np.nan, det)
+  xi = (r[:,0] * e2[:,1] - r[:,1] * e2[:,0]) / det
+  eta = (e1[:,0] * r[:,1] - e1[:,1] * r[:,0]) / det
+  weights = np.array([1. - xi - eta, xi, eta]).transpose()
+  inside = np.all(weights >= -tol, axis=1)
+  return weights, inside
+
+def quadShapeFunctions(vertices, locations, tol=1e-9, n_iter=10):
+  """
+  Compute the bilinear shape functions of quadrilaterals at the given locations.
+  The local coordinates are found by inverting the bilinear mapping with the Newton method.
+  
+  :param vertices: XY coordinates of the quadrilateral vertices (in order around the element) with shape ``(n, 4, 2)``
+  :type vertices: numpy array
+  :param locations: XY coordinates of the locations with shape ``(n, 2)``
+  :type locations: numpy array
+  :return: Shape function values with shape ``(n, 4)`` and if the location is inside the quadrilateral
+  :rtype: numpy array (float), numpy array (bool)
+  """
+  s_xi = np.array([-1., 1., 1., -1.])
+  s_eta = np.array([-1., -1., 1., 1.])
+  xi = np.zeros(len(locations))
+  eta = np.zeros(len(locations))
+  for i in range(n_iter):
+    N = 0.25 * (1 + s_xi * xi[:,None]) * (1 + s_eta * eta[:,None])
+    dN_dxi = 0.25 * s_xi * (1 + s_eta * eta[:,None])
+    dN_deta = 0.25 * s_eta * (1 + s_xi * xi[:,None])
+    r = np.sum(N[:,:,None] * vertices, axis=1) - locations
+    J = np.array([
+      [np.sum(dN_dxi * vertices[:,:,0], axis=1), np.sum(dN_deta * vertices[:,:,0], axis=1)],
+      [np.sum(dN_dxi * vertices[:,:,1], axis=1), np.sum(dN_deta * vertices[:,:,1], axis=1)],
+    ])
+    det = J[0,0] * J[1,1] - J[0,1] * J[1,0]
+    det = np.where(det == 0., np.nan, det)
+    xi = xi - (J[1,1] * r[:,0] - J[0,1] * r[:,1]) / det
+    eta = eta - (J[0,0] * r[:,1] - J[1,0] * r[:,0]) / det
+  weights = 0.25 * (1 + s_xi * xi[:,None]) * (1 + s_eta * eta[:,None])
+  size = np.max(vertices.max(axis=1) - vertices.min(axis=1), axis=1)
+  converged = np.linalg.norm(np.sum(weights[:,:,None] * vertices, axis=1) - locations, axis=1) <= 1e-6 * size
+  inside = converged & (np.abs(xi) <= 1 + tol) & (np.abs(eta) <= 1 + tol)
+  return weights, inside
@@ -0,0 +1,160 @@
+# This file is part of PyGeoStudio, an interface to GeoStudio
+# hydrogeotechnical software.
+# Copyright (C) 2024, Moïse Rousseau
+#
+# PyGeoStudio is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PyGeoStudio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import numpy as np
+import os
+import shutil
+import warnings
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .PyGeoStudio import GeoStudioFile
+from .utils import run
+
+
+class ParametricSweep:
+  """
+  Run a study for several values of parameters, solving the cases concurrently.
+
+  Each case is a copy of the base study in the working directory, modified by a user function, then solved by the GeoStudio solver.
+  At most ``n_workers`` solvers run at the same time, and the results of each case are extracted as soon as it is solved, while the next cases are still running:
+
+  .. code-block:: python
+
+      def setup(geofile, Ksat):
+          geofile.getMaterialByName("Dam fill").setSaturatedHydraulicConductivity(Ksat)
+
+      def extract(geofile):
+          results = geofile.getAnalysisByName("2 - Instantaneous drawdown")["Results"]
+          return results.getVariablesVsTime("PoreWaterPressure", locations=[[25,2]])[1]
+
+      sweep = pgs.ParametricSweep("Rapid drawdown.gsz", "sweep", analyses_to_solve=["2 - Instantaneous drawdown"], n_workers=4)
+      table = sweep.run([1e-7, 1e-6, 1e-5, 1e-4], setup, extract)
+
+  :param base_study: Path to the GeoStudio study to start from (not modified)
+  :type base_study: str
+  :param work_dir: Directory where the studies of the cases are written, one folder per case (created if needed)
+  :type work_dir: str
+  :param analyses_to_solve: Name of the analyses to solve in each case (optional, default all analyses)
+  :type analyses_to_solve: list of str
+  :param n_workers: Maximum number of cases solved at the same time (optional, default the number of CPU)
+  :type n_workers: int
+  :param solver: Command of the solver (optional, default ``GeoCmd.exe``), see ``run``
+  :type solver: str or list of str
+  """
+  def __init__(self, base_study, work_dir, analyses_to_solve=None, n_workers=None, solver="GeoCmd.exe"):
+    self.base_study = base_study
+    self.work_dir = work_dir
+    self.analyses_to_solve = analyses_to_solve
+    self.n_workers = os.cpu_count() if n_workers is None else max(1, int(n_workers))
+    self.solver = solver
+    self.files = [] #study of each case
+    self.return_codes = []
+    return
+
+  def getCaseFile(self, case):
+    """
+    Return the path to the study of a case. Each case has its own folder so the study keeps the name of the base study.
+
+    :param case: Index of the case
+    :type case: int
+    :rtype: str
+    """
+    return os.path.join(self.work_dir, f"case_{case:0>3d}", os.path.basename(self.base_study))
+
+  def prepareCase(self, case, parameters, setup=None):
+    """
+    Copy the base study for a case and apply the parameters with the setup function. The results of the analyses to solve are dropped from the copy.
+
+    :param case: Index of the case
+    :type case: int
+    :param parameters: Parameters of the case, passed to the setup function
+    :param setup: Function called as ``setup(geofile, parameters)`` to modify the study of the case (optional)
+    :type setup: callable
+    :return: Path to the study of the case
+    :rtype: str
+    """
+    f_case = self.getCaseFile(case)
+    os.makedirs(os.path.dirname(f_case), exist_ok=True)
+    shutil.copyfile(self.base_study, f_case)
+    with GeoStudioFile(f_case) as geofile:
+      if setup is not None:
+        setup(geofile, parameters)
+      analyses = None
+      if self.analyses_to_solve is not None:
+        analyses = [geofile.getAnalysisByName(x) for x in self.analyses_to_solve]
+      geofile.save(results="unsolved", analyses_to_solve=analyses)
+    return f_case
+
+  def solveCase(self, f_case):
+    """
+    Call the solver on the study of a case and return its status code.
+
+    :meta private:
+    """
+    return run(f_case, analyses_to_solve=self.analyses_to_solve, shell=False, check_output=False, solver=self.solver)
+
+  def run(self, parameters, setup, extract=None):
+    """
+    Prepare, solve and extract the results of the cases.
+    The cases are prepared one after the other and their solve is started immediately, results are extracted in the order the cases finish.
+    A case whose setup raises an error (status code -1), whose solver fails (non zero status code) or whose extraction raises an error is reported with a warning and its values are NaN.
+
+    :param parameters: Parameters of each case, e.g. a list of values or of dictionaries
+    :type parameters: list
+    :param setup: Function called as ``setup(geofile, parameters)`` to modify the study of a case
+    :type setup: callable
+    :param extract: Function called as ``extract(geofile)`` on the solved study of a case and returning a number or an array of the same shape for every case (optional)
+    :type extract: callable
+    :return: One record per case (in the order of ``parameters``) with fields ``Case``, ``ReturnCode`` (of the solver, -1 if the case was not solved) and ``Value`` (the extracted values)
+    :rtype: numpy structured array
+    """
+    parameters = list(parameters)
+    self.files = [None for x in parameters]
+    self.return_codes = [-1 for x in parameters]
+    values = [None for x in parameters]
+    with ThreadPoolExecutor(self.n_workers) as solvers: #threads wait for the solver processes
+      futures = {}
+      for case, params in enumerate(parameters):
+        try:
+          self.files[case] = self.prepareCase(case, params, setup)
+        except Exception as e:
+          warnings.warn(f"Setup failed for case {case} ({self.getCaseFile(case)}): {e}", UserWarning)
+          continue
+        futures[solvers.submit(self.solveCase, self.files[case])] = case
+      for future in as_completed(futures):
+        case = futures[future]
+        self.return_codes[case] = future.result()
+        if self.return_codes[case]:
+          warnings.warn(f"Solver failed for case {case} ({self.files[case]}) with status code {self.return_codes[case]}", UserWarning)
+          continue
+        if extract is None:
+          continue
+        try:
+          with GeoStudioFile(self.files[case]) as geofile:
+            values[case] = np.asarray(extract(geofile), dtype='f8')
+        except Exception as e:
+          warnings.warn(f"Extraction failed for case {case} ({self.files[case]}): {e}", UserWarning)
+    shape = next((x.shape for x in values if x is not None), ())
+    table = np.zeros(len(parameters), dtype=[("Case", 'i8'), ("ReturnCode", 'i8'), ("Value", 'f8', shape)])
+    table["Case"] = np.arange(len(parameters))
+    table["ReturnCode"] = self.return_codes
+    for case, value in enumerate(values):
+      if value is not None and value.shape != shape:
+        warnings.warn(f"Values extracted for case {case} have shape {value.shape} instead of {shape}, ignored", UserWarning)
+        value = None
+      table["Value"][case] = np.nan if value is None else value
+    return table
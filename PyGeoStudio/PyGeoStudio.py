@@ -23,7 +23,10 @@ import datetime
 import warnings
 from prettytable import PrettyTable
 from bs4 import BeautifulSoup
-import io
+import shutil
+import threading
+import functools
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 
 from .Analysis import Analysis
 from .Geometry import Geometry
@@ -31,43 +34,74 @@ from .Context import Context
 from .Material import Material
 from .Reinforcement import Reinforcement
 from .Mesh import Mesh
-from .Results import Results
+from .Results import Results, getSavedTimeSteps
+from .SlopeResults import SlopeResults
 from .Function import Function
 from .Dataset import Dataset, DatasetParameters
+from .Archive import Archive
 
 class GeoStudioFile:
   """
-  Main driver of the librairy that read GeoStudio .gsz file and interface its content through Python
+  Main driver of the librairy that read GeoStudio .gsz file and interface its content through Python.
+  The study is kept open for reading the results and can be used as a context manager to close it once done:
+  
+  .. code-block:: python
+  
+      with pgs.GeoStudioFile(src_file) as geofile:
+          results = geofile.getAnalysisByID(2)["Results"]
   
   :param geostudio_file: Path to the GeoStudio file
   :type geostudio_file: str
+  :param lazy: Parse the sections of the study (geometries, analyses, materials, ...) and the meshes only when they are first accessed instead of at opening (optional, default ``False``). Useful when only a small part of many studies is needed.
+  :type lazy: bool
+  :param mesh_cache: Directory where to store the parsed meshes, so they are not parsed again when the same study is reopened (e.g. in a parametric sweep) (optional, default no cache)
+  :type mesh_cache: str
   """
-  def __init__(self, geostudio_file):
+  def __init__(self, geostudio_file, lazy=False, mesh_cache=None):
     self.f_src = geostudio_file
-    self.geometries = []
-    self.meshes = []
-    self.analyses = []
-    self.contexts = []
-    self.datasets = []
-    self.materials = []
-    self.reinforcements = []
+    self.archive = Archive(geostudio_file)
+    self.lazy = lazy
+    self.mesh_cache = mesh_cache
+    self.loaded_meshes = {} #meshes loaded indexed by content key, shared between geometries and analyses
     self.xml_items = []
-    self.functions = {
-      "Material" : {
-        "Hydraulic" : {
-          "KFns" : [],
-          "VolWCFns" : [],
-        },
-      },
-      "Boundary" : {
-        "Hydraulic" : {
-          "BoundFns" : [],
-        },
-      },
-    }
+    self.xml_sections = {} #XML of the sections, parsed on demand
+    self.sections = {} #parsed sections
+    self.sections_read = {} #objects of the sections as read, to detect added or removed objects
     self.initialize()
     return
 
+  @property
+  def geometries(self):
+    return self.__getSection__("Geometries")
+
+  @property
+  def analyses(self):
+    return self.__getSection__("Analyses")
+
+  @property
+  def contexts(self):
+    return self.__getSection__("Contexts")
+
+  @property
+  def materials(self):
+    return self.__getSection__("Materials")
+
+  @property
+  def reinforcements(self):
+    return self.__getSection__("Reinforcements")
+
+  @property
+  def functions(self):
+    return self.__getSection__("Functions")
+
+  @property
+  def datasets(self):
+    return self.__getSection__("DataSets")
+
+  @property
+  def meshes(self):
+    return [geom.mesh for geom in self.geometries if geom.mesh is not None]
+
   def __getitem__(self, item):
     if item == "Analyses": return self.analyses
     elif item == "Materials": return self.materials
@@ -76,13 +110,27 @@ class GeoStudioFile:
     else:
       raise KeyError(f"There is no item \"{item}\" accessible through PyGeoStudio class")
 
+  def __enter__(self):
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    self.close()
+    return
+
+  def close(self):
+    """
+    Close the GeoStudio file opened for reading results and datasets. It will be reopened automatically if needed.
+    """
+    self.archive.close()
+    return
+
   def initialize(self):
     """
     :meta private:
     """
     #open file
     if os.path.isfile(self.f_src):
-      src = zipfile.ZipFile(self.f_src, 'r')
+      src = self.archive.open()
     else:
       raise IOError(f"File {self.f_src} doesn't exist in the current directory")
     #parse geoslope input
@@ -108,74 +156,140 @@ class GeoStudioFile:
       if element.tag == "FileInfo":
         self.f_src_info = element.attrib
         self.xml_items.append("FileInfo")
-      elif element.tag == "Geometries":
-        self.__readGeometry__(element)
-        self.xml_items.append("Geometries")
-      elif element.tag == "Analyses":
-        self.__readAnalysis__(element)
-        self.xml_items.append("Analyses")
-      elif element.tag == "Contexts":
-        #context define the material properties associated with the analysis and BC
-        self.__readContexts__(element)
-        self.xml_items.append("Contexts")
-      elif element.tag == "Materials":
-        self.__readMaterials__(element)
-        self.xml_items.append("Materials")
-      elif element.tag == "Reinforcements":
-        self.__readReinforcements__(element)
-        self.xml_items.append("Reinforcements")
-      elif element.tag == "Functions":
-        self.__readFunctions__(element)
-        self.xml_items.append("Functions")
-      elif element.tag == "DataSets":
-        self.__readDataSets__(element)
-        self.xml_items.append("DataSets")
+      elif element.tag in ["Geometries", "Analyses", "Contexts", "Materials", "Reinforcements", "Functions", "DataSets"]:
+        self.xml_sections[element.tag] = element
+        self.xml_items.append(element.tag)
       else:
         #store the item for the write method
         self.xml_items.append(element)
 
-    # Parse meshes used in the study
-    for geom in self.geometries:
-      meshid_geom = geom["MeshId"]
-      if meshid_geom is None: continue
-      f_mesh = f"mesh_{meshid_geom}.ply"
-      try:
-        mesh_obj = Mesh(meshid_geom, src.open(f_mesh))
-      except:
-        warnings.warn(f"Unable to find mesh defined for Geometry Name \"{geom['Name']}\" under {f_mesh}")
-      self.meshes.append(mesh_obj)
-      geom.mesh = mesh_obj
-
-    #make function accessible from object
-    for mat in self.materials:
-      if mat["SeepModel"] == "SatUnsat":
-        index = mat["Hydraulic"]["KFnNum"]
-        for fun in self.functions["Material"]["Hydraulic"]["KFns"]:
-          if fun["ID"] == index:
-            mat["Hydraulic"]["KFn"] = fun
-            break
-        index = mat["Hydraulic"]["VolWCFnNum"]
-        for fun in self.functions["Material"]["Hydraulic"]["VolWCFns"]:
-          if fun["ID"] == index:
-            mat["Hydraulic"]["VolWCFn"] = fun
-            break
-
-    # Create analysis structure, i.e. define Geometry, Mesh, Context and Results
-    for analysis in self.analyses:
-      geom = self.getGeometryByID(analysis["GeometryId"])
-      analysis["Geometry"] = geom
-      analysis["Results"] = Results(
-        self.f_src,
-        analysis,
-        mesh=geom.mesh,
-      )
-    for context in self.contexts:
-      analysis = self.getAnalysisByID(context["AnalysisID"])
-      analysis["Context"] = context
+    if not self.lazy:
+      for tag in self.xml_sections.keys():
+        self.__getSection__(tag)
+      # Parse meshes used in the study
+      for geom in self.geometries:
+        geom.mesh
+    return
 
-    src.close()
+  def __getSection__(self, tag):
+    """
+    Return the given section of the study, parsing it at the first call.
+    
+    :meta private:
+    """
+    if tag in self.sections:
+      return self.sections[tag]
+    if tag == "Functions":
+      self.sections[tag] = {
+        "Material" : {
+          "Hydraulic" : {
+            "KFns" : [],
+            "VolWCFns" : [],
+          },
+        },
+        "Boundary" : {
+          "Hydraulic" : {
+            "BoundFns" : [],
+          },
+        },
+      }
+    else:
+      self.sections[tag] = []
+    element = self.xml_sections.get(tag)
+    if element is None:
+      return self.sections[tag]
+    if tag == "Geometries":
+      self.__readGeometry__(element)
+      for geom in self.geometries:
+        geom.mesh_loader = self.__readMesh__
+    elif tag == "Analyses":
+      self.__readAnalysis__(element)
+      # Create analysis structure, i.e. define Geometry, Mesh, Context and Results
+      for analysis in self.analyses:
+        analysis["Geometry"] = self.getGeometryByID(analysis["GeometryId"])
+        analysis["Results"] = Results(self.archive, analysis, mesh_loader=self.__loadMesh__)
+        if analysis["Kind"] == "SLOPE/W":
+          analysis["SlopeResults"] = SlopeResults(self.archive, analysis)
+      for context in self.contexts:
+        analysis = self.getAnalysisByID(context["AnalysisID"])
+        analysis["Context"] = context
+    elif tag == "Contexts":
+      #context define the material properties associated with the analysis and BC
+      self.__readContexts__(element)
+    elif tag == "Materials":
+      self.__readMaterials__(element)
+      #make function accessible from object
+      for mat in self.materials:
+        if mat["SeepModel"] == "SatUnsat":
+          index = mat["Hydraulic"]["KFnNum"]
+          for fun in self.functions["Material"]["Hydraulic"]["KFns"]:
+            if fun["ID"] == index:
+              mat["Hydraulic"]["KFn"] = fun
+              break
+          index = mat["Hydraulic"]["VolWCFnNum"]
+          for fun in self.functions["Material"]["Hydraulic"]["VolWCFns"]:
+            if fun["ID"] == index:
+              mat["Hydraulic"]["VolWCFn"] = fun
+              break
+    elif tag == "Reinforcements":
+      self.__readReinforcements__(element)
+    elif tag == "Functions":
+      self.__readFunctions__(element)
+    elif tag == "DataSets":
+      self.__readDataSets__(element)
+    self.sections_read[tag] = list(self.__getSectionObjects__(tag))
+    return self.sections[tag]
+
+  def __getSectionObjects__(self, tag):
+    """
+    Return the list of objects in a section (Functions are flattened).
+    
+    :meta private:
+    """
+    if tag == "Functions":
+      return self.__functionToList__(self.sections[tag], [])
+    return self.sections[tag]
 
-    return
+  def __isSectionModified__(self, tag):
+    """
+    Return True if objects were added, removed or modified in a section since it was read.
+    
+    :meta private:
+    """
+    objects = self.__getSectionObjects__(tag)
+    objects_read = self.sections_read.get(tag)
+    if objects_read is None or len(objects) != len(objects_read):
+      return True
+    for obj, obj_read in zip(objects, objects_read):
+      if obj is not obj_read or obj.isModified():
+        return True
+    return False
+
+  def __readMesh__(self, geom):
+    meshid_geom = geom["MeshId"]
+    if meshid_geom is None: return None
+    f_mesh = f"mesh_{meshid_geom}.ply"
+    if self.archive.getMember(None, None, f_mesh) is None:
+      warnings.warn(f"Unable to find mesh defined for Geometry Name \"{geom['Name']}\" under {f_mesh}")
+      return None
+    return self.__loadMesh__(f_mesh, meshid_geom)
+
+  def __loadMesh__(self, member, mesh_id=None):
+    """
+    Return the mesh stored in a PLY member of the study.
+    Meshes with the same content are loaded once and shared.
+    
+    :meta private:
+    """
+    key = self.archive.getMemberKey(member)
+    if key not in self.loaded_meshes:
+      self.loaded_meshes[key] = Mesh(
+        mesh_id,
+        lambda: self.archive.openMember(member),
+        cache_dir=self.mesh_cache,
+        cache_key=key,
+      )
+    return self.loaded_meshes[key]
 
   def __readGeometry__(self,element):
     self.n_geometry = int(element.attrib["Len"])
@@ -237,7 +351,7 @@ class GeoStudioFile:
     self.n_datasets = int(element.attrib["Len"])
     for i in range(self.n_datasets):
       dataset_ = element[i]
-      new_dataset = Dataset(dataset_, self.f_src)
+      new_dataset = Dataset(dataset_, self.archive)
       self.datasets.append(new_dataset)
     return
 
@@ -247,6 +361,129 @@ class GeoStudioFile:
         return x
     raise ValueError(f"{data_name} {name} not found in file.")
 
+  @staticmethod
+  def inspect(geostudio_file):
+    """
+    Read the study information, the analysis tree and the saved times of a GeoStudio file without opening it with ``GeoStudioFile``.
+    The configuration file is parsed incrementally and parsing stops as soon as this information is found, so other sections (geometries, materials, ...) and meshes are not read.
+    Useful for triaging many studies:
+    
+    .. code-block:: python
+    
+        for f in glob.glob("*.gsz"):
+            info = pgs.GeoStudioFile.inspect(f)
+            print(f, info["FileInfo"]["Title"], [x["Name"] for x in info["Analyses"]])
+    
+    :param geostudio_file: Path to the GeoStudio file
+    :type geostudio_file: str
+    :return: A dictionary with the ``FileInfo`` attributes and the list of ``Analyses``, each described by its ``ID``, ``Name``, ``ParentID``, ``Kind``, ``Method`` and ``SavedTimes`` (as returned by ``Results.getOutputTimes``)
+    :rtype: dict
+    """
+    res = {"File":geostudio_file, "FileInfo":None, "Analyses":None}
+    with zipfile.ZipFile(geostudio_file, 'r') as src:
+      f_xml = geostudio_file.split('/')[-1][:-4] + ".xml"
+      if f_xml not in src.namelist():
+        candidates = [x for x in src.namelist() if '/' not in x and x.split('.')[-1] == "xml"]
+        if not candidates:
+          raise IOError(f"There is no xml configuration file in archive {geostudio_file}. Is this a GeoStudio study ?")
+        f_xml = candidates[0]
+      depth = 0
+      with src.open(f_xml) as f:
+        for event, element in ET.iterparse(f, events=("start", "end")):
+          if event == "start":
+            depth += 1
+            continue
+          depth -= 1
+          if depth != 1: continue
+          if element.tag == "FileInfo":
+            res["FileInfo"] = dict(element.attrib)
+          elif element.tag == "Analyses":
+            res["Analyses"] = []
+            for analysis in element:
+              info = {x.tag:x.text for x in analysis if len(x) == 0}
+              timesteps = analysis.find("TimeIncrements/TimeSteps")
+              timesteps = [] if timesteps is None else [x.attrib for x in timesteps]
+              res["Analyses"].append({
+                "ID" : int(info["ID"]),
+                "Name" : info["Name"],
+                "ParentID" : None if info.get("ParentID") is None else int(info["ParentID"]),
+                "Kind" : info.get("Kind"),
+                "Method" : info.get("Method"),
+                "SavedTimes" : [x[1] for x in getSavedTimeSteps(info.get("Method"), timesteps)],
+              })
+          element.clear() #do not keep the sections already read
+          if res["FileInfo"] is not None and res["Analyses"] is not None:
+            break
+    if res["Analyses"] is None: res["Analyses"] = []
+    return res
+
+  @staticmethod
+  def getCriticalFOS(geostudio_files, analyses=None, last_step_only=False, n_workers=None, processes=False):
+    """
+    Extract the minimum factor of safety of limit equilibrium (SLOPE/W) analyses in many GeoStudio files.
+    Studies are read concurrently. For each of them, only the analysis tree (see ``inspect``) and the slip surface results are read, so geometries, materials and meshes are never parsed.
+    
+    .. code-block:: python
+    
+        table = pgs.GeoStudioFile.getCriticalFOS(glob.glob("sweep/*.gsz"))
+        worst = table[np.nanargmin(table["FOS"])]
+    
+    :param geostudio_files: Path to the GeoStudio files
+    :type geostudio_files: list of str
+    :param analyses: Name of the analyses to extract (optional, default all the SLOPE/W analyses)
+    :type analyses: list of str
+    :param last_step_only: Extract only the last step of each analysis (optional, default all the steps with slip surface results)
+    :type last_step_only: bool
+    :param n_workers: Number of studies read concurrently (optional, default the number of CPU)
+    :type n_workers: int
+    :param processes: Read the studies in worker processes instead of threads (optional, default ``False``). On Windows, worker processes require the main script to be protected by ``if __name__ == "__main__":``.
+    :type processes: bool
+    :return: One record per file, analysis and step, with fields ``File``, ``Analysis``, ``Step``, ``Time`` (NaN if the analysis is not defined over time), ``FOS`` and ``SlipNum`` (the critical slip surface). Analyses without valid results have a NaN factor of safety and step and slip number -1.
+    :rtype: numpy structured array
+    """
+    files = [str(x) for x in geostudio_files]
+    n_workers = os.cpu_count() if n_workers is None else max(1, int(n_workers))
+    read = functools.partial(GeoStudioFile.__readCriticalFOS__, analyses=analyses, last_step_only=last_step_only)
+    if n_workers <= 1 or len(files) <= 1:
+      rows = [x for f in files for x in read(f)]
+    else:
+      executor = ProcessPoolExecutor if processes else ThreadPoolExecutor
+      with executor(min(n_workers, len(files))) as workers:
+        rows = [x for res in workers.map(read, files) for x in res]
+    str_len = lambda i: max([len(x[i]) for x in rows], default=1)
+    dtype = [("File", f"U{str_len(0)}"), ("Analysis", f"U{str_len(1)}"), ("Step", 'i8'), ("Time", 'f8'), ("FOS", 'f8'), ("SlipNum", 'i8')]
+    return np.array(rows, dtype=dtype)
+
+  @staticmethod
+  def __readCriticalFOS__(geostudio_file, analyses=None, last_step_only=False):
+    """
+    Return the rows of ``getCriticalFOS`` for one GeoStudio file.
+    
+    :meta private:
+    """
+    try:
+      info = GeoStudioFile.inspect(geostudio_file)
+    except (IOError, zipfile.BadZipFile) as e:
+      warnings.warn(f"Can't read {geostudio_file}, skipped: {e}", UserWarning)
+      return []
+    rows = []
+    with Archive(geostudio_file) as archive:
+      for analysis in info["Analyses"]:
+        if analyses is None and analysis["Kind"] != "SLOPE/W": continue
+        if analyses is not None and analysis["Name"] not in analyses: continue
+        slope_results = SlopeResults(archive, analysis)
+        steps = slope_results.getSteps()
+        if not steps:
+          rows.append((geostudio_file, analysis["Name"], -1, np.nan, np.nan, -1))
+          continue
+        times = slope_results.getStepTimes()
+        if last_step_only:
+          steps, times = steps[-1:], times[-1:]
+        for step, t in zip(steps, times):
+          slip_num, fos = slope_results.getCriticalSlipSurface(step)
+          rows.append((geostudio_file, analysis["Name"], step, t, fos, -1 if slip_num is None else slip_num))
+    return rows
+
   def showAnalysisTree(self):
     """
     Print the analysis tree in the GeoStudio file with analysis ID, name and parent ID if defined.
@@ -473,7 +710,10 @@ class GeoStudioFile:
     out_root = ET.Element(src_root.tag)
     out_root.attrib = src_root.attrib
     for element in self.xml_items:
-      if element == "FileInfo":
+      if isinstance(element, str) and element in self.xml_sections and (element not in self.sections or not self.__isSectionModified__(element)):
+        #section never accessed or not modified, so unchanged
+        out_root.append(self.xml_sections[element])
+      elif element == "FileInfo":
         sub = ET.SubElement(out_root, "FileInfo")
         sub.attrib = self.f_src_info.copy()
         sub.attrib["LastAuthor"] = "Modified by PyGeoStudio"
@@ -543,7 +783,8 @@ class GeoStudioFile:
         raise RuntimeError("Error writing Functions... Did you modify the Function attribute yourself ? If no, this is an please contact for assistance")
     return
 
-  def __functionToList__(self, d, l=[]):
+  def __functionToList__(self, d, l=None):
+    if l is None: l = [] #a default list would be shared between the calls
     for k,v in d.items():
       if isinstance(v, dict):
         self.__functionToList__(v, l)
@@ -552,89 +793,108 @@ class GeoStudioFile:
           l.append(fun)
     return l
 
-  def save(self):
+  def save(self, results="all", analyses_to_solve=None):
     """
     Save the modification made by PyGeoStudio to the current GeoStudio file.
+    
+    :param results: Results to keep in the study: ``"all"``, ``"unsolved"`` to drop the results of the analyses in ``analyses_to_solve`` which will be overwritten by the solver, or ``"none"`` to write the input only (optional, default ``"all"``)
+    :type results: str
+    :param analyses_to_solve: The analyses about to be solved, used with ``results="unsolved"`` (optional, default all analyses)
+    :type analyses_to_solve: list of PyGeoStudio.Analysis object
     """
-    # zipfile can't overwrite file.
-    # So we must write the modified study in a BytesIO then overwrite the results
-    temp_space = io.BytesIO()
-    self.saveAs(temp_space)
-    # overwrite current study
-    zip_mem = zipfile.ZipFile(temp_space, 'r') #temp zip in memory
-    zip_out = zipfile.ZipFile(
-      self.f_src, 'w',
-      compression=zipfile.ZIP_DEFLATED,
-      compresslevel=5,
-    )
-    for f in zip_mem.namelist():
-      zip_out.writestr(f, data=zip_mem.read(f))
-    zip_mem.close()
-    zip_out.close()
+    self.__writeStudy__(self.f_src, self.prefix, 5, results, analyses_to_solve)
     return
 
-  def saveAs(self, f_out, compresslevel=5):
+  def saveAs(self, f_out, compresslevel=5, results="all", analyses_to_solve=None):
     """
-    Write the (modified) study under a new file. Note the results are not copied to the new study.
+    Write the (modified) study under a new file.
     
     :param f_out: Name of the new file (must be different than the input)
     :type f_out: str
     :param compresslevel: Level of compression of the output file from 0 (uncompressed) to 9 (fully compressed) (optional, default=1)
     :type compresslevel: int
+    :param results: Results to copy to the new study: ``"all"``, ``"unsolved"`` to drop the results of the analyses in ``analyses_to_solve``, or ``"none"`` to write the input only (optional, default ``"all"``)
+    :type results: str
+    :param analyses_to_solve: The analyses about to be solved, used with ``results="unsolved"`` (optional, default all analyses)
+    :type analyses_to_solve: list of PyGeoStudio.Analysis object
+    """
+    # create output
+    if f_out == self.f_src:
+      raise ValueError("The new file has the same name than the input file. Please write within another file or use the save() method")
+    ext = f_out.split('.')[-1]
+    if ext != "gsz":
+      f_out += ".gsz"
+    prefix = f_out.split('/')[-1][:-4]
+    self.__writeStudy__(f_out, prefix, compresslevel, results, analyses_to_solve)
+    print(f"GeoStudio study successfully written in {f_out}")
+    return
+
+  def __writeStudy__(self, f_out, prefix, compresslevel, results="all", analyses_to_solve=None):
     """
-    if isinstance(f_out, io.BytesIO):
-      # if BytesIO, this mean save() method
-      zip_out = zipfile.ZipFile(f_out, 'a')
-      prefix = self.f_src.split('/')[-1][:-4]
-    else:
-      # create output
-      if f_out == self.f_src:
-        raise ValueError("The new file has the same name than the input file. Please write within another file or use the save() method")
-      ext = f_out.split('.')[-1]
-      if ext != "gsz":
-        f_out += ".gsz"
-      prefix = f_out.split('/')[-1][:-4]
+    Write the study in f_out.
+    Only the main xml file and the modified datasets are regenerated, the other files are copied without being decompressed and recompressed.
+    Results are all the files in the analysis folders, they are dropped following the ``results`` policy.
+    The study is first written in a temporary file in the same directory, which then replaces f_out.
+    
+    :meta private:
+    """
+    if results not in ["all", "unsolved", "none"]:
+      raise ValueError(f"Unknown results policy \"{results}\". Must be \"all\", \"unsolved\" or \"none\"")
+    zip_src = self.archive.open() #source geostudio zip
+    dropped_folders = set()
+    if results == "none" or (results == "unsolved" and analyses_to_solve is None):
+      dropped_folders = set([x for x in self.archive.members.keys() if x is not None])
+    elif results == "unsolved":
+      dropped_folders = set([x["Name"].replace('/','&3') for x in analyses_to_solve])
+    #temporary file unique to the process and thread, created with the default permissions of a new file
+    f_tmp = f"{os.path.abspath(f_out)}.{os.getpid()}-{threading.get_ident()}.tmp"
+    try:
       zip_out = zipfile.ZipFile(
-        f_out, mode="w",
+        f_tmp, mode="w",
         compression=zipfile.ZIP_DEFLATED,
         compresslevel=compresslevel
       )
-    # Write
-    zip_src = zipfile.ZipFile(self.f_src, 'r') #source geostudio zip
-    for dataset in self.datasets:
-      dataset_out = zip_out.open(f"dataset_{dataset['CsvID']}.csv", 'w')
-      arr = dataset.getData()
-      np.savetxt(
-        dataset_out,
-        np.append(
-          np.arange(1,arr.shape[0]+1)[:,None],
-          arr,
-          axis=1,
-        ),
-        delimiter=',',
-        header = "Undefined," + ','.join(dataset["Parameters"]),
-        fmt = ["%i"] + ["%.6e" for x in dataset["Parameters"]],
-        comments = "",
-      )
-      dataset_out.close()
-    for f in zip_src.namelist():
-      if f.split('.')[-1] == "xml": #main xml file
-        main_xml_str = self.genConfigurationFile()
-        zip_out.writestr(f.replace(self.prefix,prefix), data=main_xml_str)
-      elif ".csv" in f and "dataset" in f:
-        continue
-      #TODO: meshes
-      else:
-        zip_out.writestr(f, data=zip_src.read(f))
-    zip_src.close()
-    zip_out.close()
-    # Write meshes
-#    for mesh in self.meshes:
-#      byte_str = io.BytesIO()
-#      mesh.write(byte_str)
-#      mesh_name = "mesh_" + str(mesh.mesh_id) + ".ply"
-#      zip_out.writestr(mesh_name, data=byte_str.getvalue())
-    if not isinstance(f_out, io.BytesIO):
-      print(f"GeoStudio study successfully written in {f_out}")
+      datasets_written = []
+      for dataset in self.sections.get("DataSets", []):
+        if not dataset.isModified(): continue
+        datasets_written.append(f"dataset_{dataset['CsvID']}.csv")
+        dataset_out = zip_out.open(datasets_written[-1], 'w')
+        arr = dataset.data["Data"]
+        np.savetxt(
+          dataset_out,
+          np.append(
+            np.arange(1,arr.shape[0]+1)[:,None],
+            arr,
+            axis=1,
+          ),
+          delimiter=',',
+          header = "Undefined," + ','.join(dataset.data["Parameters"]),
+          fmt = ["%i"] + ["%.6e" for x in dataset.data["Parameters"]],
+          comments = "",
+        )
+        dataset_out.close()
+      main_xml_str = None
+      to_copy = []
+      for f in zip_src.namelist():
+        if '/' in f and f.split('/')[0] in dropped_folders:
+          continue
+        if f.split('.')[-1] == "xml": #main xml file
+          if main_xml_str is None: main_xml_str = self.genConfigurationFile()
+          zip_out.writestr(f.replace(self.prefix,prefix), data=main_xml_str)
+        elif f in datasets_written:
+          continue
+        #TODO: meshes
+        else:
+          to_copy.append(f)
+      self.archive.copyMembers(zip_out, to_copy)
+      zip_out.close()
+      if os.path.exists(f_out): #keep the permissions of the study replaced
+        shutil.copymode(f_out, f_tmp)
+      if os.path.abspath(f_out) == os.path.abspath(self.f_src):
+        self.archive.close() #release the source before replacing it
+      os.replace(f_tmp, f_out)
+    except:
+      if os.path.exists(f_tmp): os.remove(f_tmp)
+      raise
     return
 
@@ -0,0 +1,135 @@
+# This file is part of PyGeoStudio, an interface to GeoStudio
+# hydrogeotechnical software.
+# Copyright (C) 2024, Moïse Rousseau
+#
+# PyGeoStudio is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PyGeoStudio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import numpy as np
+import json
+import os
+
+
+class ResultCache:
+  """
+  Columnar on-disk store of the node results of an analysis.
+
+  Each output variable is stored in its own ``.npy`` file as an array of shape ``(n_steps, n_nodes)``, so a snapshot is a contiguous row read with a single access.
+  Rows are the saved steps in time order and columns the nodes ordered by ID (nodes without results are NaN).
+  A ``manifest.json`` file describes the store and records the content key (CRC and size) of the result files it was built from, so the store can be invalidated when the study changes.
+
+  :param path: Directory of the store
+  :type path: str
+  """
+  manifest_name = "manifest.json"
+
+  def __init__(self, path):
+    self.path = path
+    self.manifest = None
+    self.arrays = {}
+    return
+
+  def readManifest(self):
+    """
+    Read the manifest of the store. Return None if the store was not built.
+
+    :rtype: dict
+    """
+    f = os.path.join(self.path, self.manifest_name)
+    if not os.path.isfile(f):
+      return None
+    with open(f, 'r') as manifest:
+      return json.load(manifest)
+
+  def isUpToDate(self, members):
+    """
+    Check if the store was built from the given result files.
+
+    :param members: Content key of the result file of each saved step, indexed by step
+    :type members: dict
+    :rtype: bool
+    """
+    if self.manifest is None:
+      self.manifest = self.readManifest()
+    return self.manifest is not None and self.manifest["members"] == members
+
+  def build(self, results, members):
+    """
+    Build the store from the results of an analysis. Steps are written in the store as they are read, so memory use is bounded by a few snapshots.
+
+    :param results: The results to store
+    :type results: Results object
+    :param members: Content key of the result file of each saved step, indexed by step
+    :type members: dict
+    """
+    os.makedirs(self.path, exist_ok=True)
+    f_manifest = os.path.join(self.path, self.manifest_name)
+    if os.path.isfile(f_manifest):
+      os.remove(f_manifest) #the store is invalid until fully written
+    self.manifest = None
+    self.arrays = {}
+    variables = results.getOutputVariables()[1:]
+    files = {var:f"variable_{i}.npy" for i,var in enumerate(variables)}
+    arrays = None
+    steps = [x[0] for x in results.saved_time]
+    for j,data in enumerate(results.__readNodeFiles__(steps)):
+      timestep = results.saved_time[j]
+      if arrays is None:
+        n_nodes = len(data)
+        arrays = [
+          np.lib.format.open_memmap(
+            os.path.join(self.path, files[var]), mode="w+", dtype='f8', shape=(len(results.saved_time), n_nodes)
+          ) for var in variables
+        ]
+      if len(data) > n_nodes:
+        raise ValueError(f"Step {timestep[0]} of analysis \"{results.analysis_name}\" has more nodes than the first step, can't store it")
+      for i,arr in enumerate(arrays):
+        arr[j,:len(data)] = data[:,i+1]
+        arr[j,len(data):] = np.nan
+    for arr in arrays or []:
+      arr.flush()
+    del arrays
+    manifest = {
+      "analysis" : results.analysis_name,
+      "steps" : [x[0] for x in results.saved_time],
+      "times" : [x[1] for x in results.saved_time],
+      "variables" : variables,
+      "files" : files,
+      "members" : members,
+    }
+    with open(f_manifest + ".tmp", 'w') as f:
+      json.dump(manifest, f, indent=2)
+    os.replace(f_manifest + ".tmp", f_manifest)
+    self.manifest = manifest
+    return
+
+  def getArray(self, variable):
+    """
+    Return the memory mapped array of a variable with shape ``(n_steps, n_nodes)``. Return None if the variable is not stored.
+
+    :param variable: Name of the variable
+    :type variable: str
+    :rtype: numpy.memmap
+    """
+    if variable not in self.manifest["files"]:
+      return None
+    if variable not in self.arrays:
+      self.arrays[variable] = np.load(os.path.join(self.path, self.manifest["files"][variable]), mmap_mode='r')
+    return self.arrays[variable]
+
+  def close(self):
+    """
+    Release the memory mapped arrays.
+    """
+    self.arrays = {}
+    return
@@ -16,34 +16,262 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 import numpy as np
-import zipfile
+import warnings
+import os
+import collections
+from time import perf_counter
+from concurrent.futures import ThreadPoolExecutor
+
+from .Archive import Archive
+from .Mesh import Mesh
+from .ResultCache import ResultCache
+from .writers import VTUSeriesWriter, XDMFSeriesWriter
+from .csv_reader import readCsvIndex, getRowOffsets, readCsvRows, readCsv
+
+STEP_BATCH_SIZE = 8 #maximum number of steps read by a worker at once, bounds the memory used
+
+RESULT_KINDS = {
+  "node" : "node.csv", #one row per mesh node
+  "element" : "element.csv", #one row per element
+  "elementnode" : "elementnode.csv", #one row per node of each element (integration points)
+}
+
+def getSavedTimeSteps(method, timesteps):
+  """
+  Return the step number and time of the saved timesteps of an analysis.
+  
+  :param method: Method of the analysis (``Transient``, ``SteadyState``, ...)
+  :type method: str
+  :param timesteps: The timesteps of the analysis as defined in its TimeIncrements
+  :type timesteps: list of dict
+  :rtype: list of (int, float)
+  """
+  if method == "Transient":
+    return tuple((i+1,float(x["ElapsedTime"])) for i,x in enumerate(timesteps) if x.get("Save"))
+  else: #Steady State simulation
+    return [(1,1e40)]
+
+def nodeArray(ids, values, n_nodes):
+  """
+  Arrange the rows of a node result file by node ID: return an array with at least n_nodes rows, the node ID in the first column and the values in the next ones. Nodes without results are filled with NaN.
+  
+  :meta private:
+  """
+  n_nodes = max(n_nodes, ids.max(initial=0))
+  data = np.zeros((n_nodes, values.shape[1]+1)) + np.nan
+  data[ids-1,0] = ids
+  data[ids-1,1:] = values
+  return data
+
+def mapOrdered(executor, func, items, window):
+  """
+  Apply func on the items with the executor and yield the results in the order of the items.
+  At most window items are processed or waiting to be consumed at the same time, so memory stay bounded.
+  
+  :meta private:
+  """
+  futures = collections.deque()
+  try:
+    for item in items:
+      futures.append(executor.submit(func, item))
+      if len(futures) >= window:
+        yield futures.popleft().result()
+    while futures:
+      yield futures.popleft().result()
+  finally:
+    for future in futures:
+      future.cancel()
+
+def readStoredNodes(arr, nodes):
+  """
+  Return the values of the given nodes (0 based) in the last axis of an array from the result store, NaN for nodes outside the array.
+  
+  :meta private:
+  """
+  nodes = np.asarray(nodes, dtype='i8')
+  found = (nodes >= 0) & (nodes < arr.shape[-1])
+  out = np.full(arr.shape[:-1] + (len(nodes),), np.nan)
+  out[...,found] = arr[...,nodes[found]]
+  return out
 
 class Results:
-  def __init__(self, f_src, analysis, mesh=None):
-    self.f_src = f_src
+  """
+  Interface to the results of an analysis.
+
+  :param f_src: The GeoStudio study (path or opened archive)
+  :type f_src: str or Archive
+  :param analysis: The analysis
+  :type analysis: Analysis object
+  :param mesh: The mesh on which the results are defined (optional, default the mesh written by the solver in the analysis folder, else the geometry mesh)
+  :type mesh: Mesh object
+  :param mesh_loader: Function returning the Mesh object from the name of a PLY member in the study, to share meshes between analyses (optional)
+  :type mesh_loader: callable
+  """
+  def __init__(self, f_src, analysis, mesh=None, mesh_loader=None):
+    self.archive = f_src if isinstance(f_src, Archive) else Archive(f_src)
+    self.f_src = self.archive.f_src
     self.analysis = analysis
     self.analysis_name = analysis["Name"]
-    self.saved_time = None
-    if self.analysis["Method"] == "Transient":
-      self.saved_time = tuple((i+1,float(x["ElapsedTime"])) for i,x in enumerate(analysis["TimeIncrements"]["TimeSteps"]) if x.get("Save"))
-    else: #Steady State simulation
-      self.saved_time = [(1,1e40)]
-    self.mesh = mesh
+    self.folder = self.analysis_name.replace('/','&3')
+    self.saved_time = getSavedTimeSteps(
+      self.analysis["Method"],
+      analysis["TimeIncrements"].data["TimeSteps"] if self.analysis["Method"] == "Transient" else None,
+    )
+    self.mesh_object = mesh
+    self.mesh_key = None #key of the analysis mesh loaded, None if the mesh was given
+    self.mesh_loader = mesh_loader
+    self.cache = None #on-disk result store, see buildCache()
+    self.cache_stat = None #state of the study when the store was last checked
+    self.n_workers = 1 #see setWorkers()
+    self.executor = None #thread pool reading the steps, created at first use
+    return
+
+  def __del__(self):
+    self.__closeExecutor__()
+
+  def setWorkers(self, n_workers=None):
+    """
+    Read and parse the result files of the different steps concurrently in a pool of threads, kept for the next reads.
+    This applies to ``getVariablesVsTime``, ``iterSnapshots``, ``buildCache`` and the exporters. Results are still returned in time order.
+    Each thread reads batches of consecutive steps. Decompression releases the GIL but parsing mostly holds it, so the speedup depends on the size of the result files and is only obtained with several CPU.
+    On ``Rapid drawdown.gsz`` (10 steps of 553 nodes, 7 ms in serial) and a single CPU, 2 and 4 threads run at 0.8x to 1.0x of the serial speed.
+    
+    :param n_workers: Number of threads (optional, default the number of CPU). 1 reads the steps one after the other (default behaviour).
+    :type n_workers: int
+    """
+    self.__closeExecutor__()
+    self.n_workers = os.cpu_count() if n_workers is None else max(1, int(n_workers))
     return
 
-  def getOutputVariables(self):
+  def __closeExecutor__(self):
+    """
+    Shut down the thread pool, if any.
+    
+    :meta private:
+    """
+    executor, self.executor = getattr(self, "executor", None), None
+    if executor is not None:
+      executor.shutdown(wait=False)
+    return
+
+  @property
+  def mesh(self):
+    """
+    Mesh on which the results are defined.
+    This is the mesh written by the solver in the analysis folder (``Mesh.ply``) if present, else the mesh of the analysis geometry.
+    The analysis mesh is reloaded if it changed in the study (e.g. after the analysis was solved again).
+    """
+    if self.mesh_object is not None and self.mesh_key is None:
+      return self.mesh_object
+    member = self.archive.getMember(self.folder, None, "Mesh.ply")
+    if member is None:
+      self.mesh_object, self.mesh_key = None, None
+      if self.analysis["Geometry"] is not None:
+        return self.analysis["Geometry"]["Mesh"]
+      return None
+    key = self.archive.getMemberKey(member)
+    if key != self.mesh_key:
+      if self.mesh_loader is not None:
+        self.mesh_object = self.mesh_loader(member)
+      else:
+        self.mesh_object = Mesh(None, lambda: self.archive.openMember(member))
+      self.mesh_key = key
+    return self.mesh_object
+
+  @mesh.setter
+  def mesh(self, mesh):
+    self.mesh_object = mesh
+    self.mesh_key = None
+
+  def buildCache(self, path):
+    """
+    Convert the node results of all the saved steps into a columnar store on disk (one ``.npy`` array per variable with shape ``(n_steps, n_nodes)``) and read the results from it afterward.
+    ``getSnapshot`` and ``getVariablesVsTime`` then read the store through memory mapping instead of parsing the CSV files in the study.
+    If the store already exists and was built from the same result files, it is reused without being rebuilt.
+    The store is ignored if the results in the study change (e.g. the analysis is solved again), call ``buildCache`` again to update it.
+    
+    :param path: Directory of the store
+    :type path: str
+    """
+    cache = ResultCache(path)
+    members = self.__getStepKeys__()
+    if not cache.isUpToDate(members):
+      cache.build(self, members)
+    self.cache = cache
+    self.cache_stat = self.archive.stat
+    return
+
+  def getResultArray(self, variable):
+    """
+    Return all the values of a variable as a read-only array memory mapped on the result store (see ``buildCache``), with shape ``(n_times, n_nodes)``.
+    Nothing is read from the disk until the array is accessed and then only the pages touched are read, so snapshots (``arr[i]``) and node histories (``arr[:,node]``) of very large results can be accessed without loading them in memory.
+    
+    :param variable: Name of variable desired (must match the name from ``getOutputVariables``)
+    :type variable: str
+    :return: Values of the variable, ordered by saved time and node ID
+    :rtype: numpy.memmap
+    """
+    cache = self.__getCache__()
+    if cache is None:
+      raise ValueError("No result store up to date with the study, call buildCache() first")
+    arr = cache.getArray(variable)
+    if arr is None:
+      raise ValueError(f"Output variables \"{variable}\" not found in result store. Available output variables are: {cache.manifest['variables']}")
+    return arr
+
+  def getNodeHistory(self, variable, node):
+    """
+    Return the values of a variable at a node for all the saved times as a read-only view on the result store (see ``buildCache``).
+    
+    :param variable: Name of variable desired (must match the name from ``getOutputVariables``)
+    :type variable: str
+    :param node: Index of the node (0 based)
+    :type node: int
+    :return: Values of the variable at the node
+    :rtype: numpy.memmap
+    """
+    return self.getResultArray(variable)[:,node]
+
+  def __getStepKeys__(self):
+    """
+    Return the content key of the node result file of each saved step.
+    
+    :meta private:
+    """
+    return {str(x[0]):self.archive.getMemberKey(self.__getResultFile__(x[0])) for x in self.saved_time}
+
+  def __getCache__(self):
+    """
+    Return the result store if it was built and is up to date with the study, else None.
+    
+    :meta private:
+    """
+    if self.cache is None:
+      return None
+    self.archive.open()
+    if self.cache_stat != self.archive.stat:
+      try:
+        up_to_date = self.cache.isUpToDate(self.__getStepKeys__())
+      except ValueError:
+        up_to_date = False
+      if not up_to_date:
+        warnings.warn(f"Result store {self.cache.path} is out of date with the study, results are read from the study. Call buildCache() to update it.", UserWarning)
+        self.cache.close()
+        self.cache = None
+        return None
+      self.cache_stat = self.archive.stat
+    return self.cache
+
+  def getOutputVariables(self, kind="node"):
     """
     Return a list of the output variables in the results
     
+    :param kind: Kind of results, ``node``, ``element`` or ``elementnode`` (optional, default ``node``)
+    :type kind: str
     :return: the list
     :rtype: list
     """
-    src = zipfile.ZipFile(self.f_src)
-    res = src.open(f"{self.analysis_name.replace('/','&3')}/{0:0>3d}/node.csv", 'r')
-    header = res.readline().decode().rstrip().split(',')
-    res.close()
-    src.close()
-    return header
+    return self.archive.getHeader(self.__getResultFile__(0, self.__getKindFile__(kind)))
   
   def getOutputTimes(self):
     """
@@ -54,7 +282,7 @@ class Results:
     """
     return [x[1] for x in self.saved_time] #return a copy
   
-  def getSnapshot(self, variable, time=None):
+  def getSnapshot(self, variable, time=None, nodes=None):
     """
     Extract the variable on the whole domain but at one particular time.
     
@@ -62,105 +290,430 @@ class Results:
     :type variable: str
     :param time: Time at which to retrieve variable value (required for transient analysis)
     :type time: float
-    :return: Variable values ordered by node ID
+    :param nodes: Restrict the extraction to these mesh nodes (0 based index, optional). Only the corresponding rows are read in the result file.
+    :type nodes: list of int
+    :return: Variable values ordered by node ID (or ordered as ``nodes`` if given)
     :rtype: numpy.array
     """
     if self.analysis["Method"] == "Transient" and time is None:
       raise ValueError("Transient analysis results requires the time to extract the snapshot")
-    try:
-      variable_index = self.getOutputVariables().index(variable)
-    except:
-      raise ValueError(f"Output variables \"{variable}\" not found in file. Available output variables are: {self.getOutputVariables()}")
-    src = zipfile.ZipFile(self.f_src)
-    t_index = self.saved_time[[x[1] for x in self.saved_time].index(time)][0]
-    f = src.open(f"{self.analysis_name.replace('/','&3')}/{t_index:0>3d}/node.csv")
-    data = np.genfromtxt(f, delimiter=',', skip_header=1)
-    if len(data) != len(self.mesh.vertices):
-      data_ = np.zeros(len(self.mesh.vertices)) + np.nan
-      data_[data[:,0].astype('i8')-1] = data[:,variable_index]
-    else:
-      data_ = data[:,variable_index]
-    f.close()
-    src.close()
-    return data_
+    header = self.getOutputVariables()
+    if variable not in header:
+      raise ValueError(f"Output variables \"{variable}\" not found in file. Available output variables are: {header}")
+    variable_index = header.index(variable)
+    j = [x[1] for x in self.saved_time].index(time) if time is not None else 0
+    t_index = self.saved_time[j][0]
+    cache = self.__getCache__()
+    if cache is not None and cache.getArray(variable) is not None:
+      arr = cache.getArray(variable)
+      if nodes is not None:
+        return readStoredNodes(arr[j], nodes)
+      return np.array(arr[j])
+    if nodes is not None:
+      return self.__readNodeRows__(t_index, nodes)[:,variable_index]
+    return self.__readNodeFile__(t_index)[:,variable_index]
     
-  def getVariablesVsTime(self, variable, locations):
+  def getSnapshots(self, variables=None, time=None):
     """
-    Extract the variable at the locations given against all timestep.
+    Extract several variables on the whole domain at one particular time.
+    The result file is parsed once for all the variables.
     
-    :param variable: Name of variable desired (must match the name from ``getOutputVariables``)
+    :param variables: Name of the variables desired (must match the name from ``getOutputVariables``) (optional, default all the output variables)
+    :type variables: list of str
+    :param time: Time at which to retrieve variable value (required for transient analysis)
+    :type time: float
+    :return: Dictionnary with the variable values ordered by node ID
+    :rtype: dict
+    """
+    if time is None:
+      if self.analysis["Method"] == "Transient":
+        raise ValueError("Transient analysis results requires the time to extract the snapshot")
+      time = self.saved_time[0][1]
+    for t, snapshot in self.iterSnapshots(variables, [time]):
+      return snapshot
+
+  def getElementSnapshot(self, variable, time=None, elements=None):
+    """
+    Extract an element variable (see ``getOutputVariables("element")``) on the whole domain but at one particular time.
+    
+    :param variable: Name of variable desired
     :type variable: str
+    :param time: Time at which to retrieve variable value (required for transient analysis)
+    :type time: float
+    :param elements: Restrict the extraction to these elements (0 based index, optional). Only the corresponding rows are read in the result file.
+    :type elements: list of int
+    :return: Variable values ordered by element ID (or ordered as ``elements`` if given), NaN for elements without results
+    :rtype: numpy.array
+    """
+    return self.__getKindSnapshot__(variable, time, elements, "element")
+
+  def getElementNodeSnapshot(self, variable, time=None, elements=None):
+    """
+    Extract an element node variable (see ``getOutputVariables("elementnode")``) on the whole domain but at one particular time.
+    Element node values are ordered as the nodes of the elements in the mesh connectivity, use ``getElementNodeMap`` to get the element and the node of each value.
+    
+    :param variable: Name of variable desired
+    :type variable: str
+    :param time: Time at which to retrieve variable value (required for transient analysis)
+    :type time: float
+    :param elements: Restrict the extraction to the nodes of these elements (0 based index, optional). Only the corresponding rows are read in the result file.
+    :type elements: list of int
+    :return: Variable values ordered by element node ID, NaN for element nodes without results. If ``elements`` is given, the values of the nodes of each element one after the other.
+    :rtype: numpy.array
+    """
+    rows = None
+    if elements is not None:
+      rows = self.__getElementNodeRows__(elements)
+    return self.__getKindSnapshot__(variable, time, rows, "elementnode")
+
+  def getElementNodeMap(self, elements=None):
+    """
+    Return the element and the mesh node of each element node, in the order of the values returned by ``getElementNodeSnapshot``.
+    
+    :param elements: Restrict to the nodes of these elements (0 based index, optional)
+    :type elements: list of int
+    :return: Element index and node index (0 based) of each element node
+    :rtype: numpy array (int), numpy array (int)
+    """
+    offsets = self.mesh.element_offsets
+    if elements is None:
+      return np.repeat(np.arange(len(offsets)-1), np.diff(offsets)), self.mesh.element_nodes.copy()
+    elements = np.asarray(elements, dtype='i8')
+    rows = self.__getElementNodeRows__(elements)
+    return np.repeat(elements, np.diff(offsets)[elements]), self.mesh.element_nodes[rows]
+
+  def __getElementNodeRows__(self, elements):
+    """
+    Return the element node rows (0 based) of the nodes of the given elements, one element after the other.
+    
+    :meta private:
+    """
+    offsets = self.mesh.element_offsets
+    elements = np.asarray(elements, dtype='i8')
+    sizes = np.diff(offsets)[elements]
+    starts = np.repeat(offsets[elements] - np.cumsum(sizes) + sizes, sizes)
+    return starts + np.arange(sizes.sum())
+
+  def __getKindSnapshot__(self, variable, time, rows, kind):
+    """
+    Extract a variable of the given kind of results at one time, for the given rows (0 based) or all of them.
+    
+    :meta private:
+    """
+    if self.analysis["Method"] == "Transient" and time is None:
+      raise ValueError("Transient analysis results requires the time to extract the snapshot")
+    header = self.getOutputVariables(kind)
+    if variable not in header:
+      raise ValueError(f"Output variables \"{variable}\" not found in {kind} results. Available output variables are: {header}")
+    j = [x[1] for x in self.saved_time].index(time) if time is not None else 0
+    t_index = self.saved_time[j][0]
+    if rows is not None:
+      return self.__readNodeRows__(t_index, rows, kind)[:,header.index(variable)]
+    return self.__readNodeFile__(t_index, kind)[:,header.index(variable)]
+
+  def iterSnapshots(self, variables=None, times=None, kind="node"):
+    """
+    Iterate over the saved times and yield the variables on the whole domain, one time at a time.
+    Each result file is parsed once for all the variables and only one snapshot is held in memory, so reductions over thousands of steps run in constant memory:
+    
+    .. code-block:: python
+    
+        envelope = None
+        for t, snapshot in results.iterSnapshots("PoreWaterPressure"):
+            pwp = snapshot["PoreWaterPressure"]
+            envelope = pwp if envelope is None else np.fmax(envelope, pwp)
+    
+    :param variables: Name of the variables desired (must match the name from ``getOutputVariables``) (optional, default all the output variables)
+    :type variables: str or list of str
+    :param times: Saved times to iterate over (optional, default all the saved times)
+    :type times: list of float
+    :param kind: Kind of results, ``node``, ``element`` or ``elementnode`` (optional, default ``node``)
+    :type kind: str
+    :return: Generator of the time and a dictionnary with the variable values ordered by node ID (or element and element node ID)
+    :rtype: generator of (float, dict)
+    """
+    header = self.getOutputVariables(kind)
+    if variables is None:
+      variables = header[1:]
+    elif isinstance(variables, str):
+      variables = [variables]
+    for var in variables:
+      if var not in header:
+        raise ValueError(f"Output variables \"{var}\" not found in file. Available output variables are: {header}")
+    saved_times = self.getOutputTimes()
+    if times is None:
+      indices = range(len(saved_times))
+    else:
+      for t in times:
+        if t not in saved_times:
+          raise ValueError(f"Time {t} is not a saved time of the analysis. Saved times are: {saved_times}")
+      indices = [saved_times.index(t) for t in times]
+    cache = self.__getCache__() if kind == "node" else None
+    if cache is not None and all([cache.getArray(var) is not None for var in variables]):
+      for j in indices:
+        yield saved_times[j], {var:np.array(cache.getArray(var)[j]) for var in variables}
+      return
+    steps = [self.saved_time[j][0] for j in indices]
+    for j, data in zip(indices, self.__readNodeFiles__(steps, kind)):
+      yield saved_times[j], {var:data[:,header.index(var)] for var in variables}
+
+  def getVariablesVsTime(self, variable, locations, interpolation="nearest"):
+    """
+    Extract the variable at the locations given against all timestep.
+    Locations are resolved to mesh nodes once, then all the saved timesteps are read in a single pass over the study where only the rows of these nodes are parsed.
+    
+    :param variable: Name of variable desired (must match the name from ``getOutputVariables``). Several variables can be extracted at once by giving a list of names.
+    :type variable: str or list of str
     :param locations: Location at which to retrive variable value
     :type locations: list
-    :return: Time and variable values at different location and all times
+    :param interpolation: ``"nearest"`` to take the value at the closest mesh node, or ``"linear"`` to interpolate the node values of the element containing the location with its (bi)linear shape functions. Locations outside the mesh fall back to the closest node. (optional, default ``"nearest"``)
+    :type interpolation: str
+    :return: Time and variable values at different location and all times. If a list of variables is given, return the saved times with shape ``(n_times)`` and the values with shape ``(n_times, n_locations, n_variables)``.
     :rtype: numpy.array, numpy.array
     """
-    #check if variable is output and get its index
-    try:
-      variable_index = self.getOutputVariables().index(variable)
-    except:
-      raise ValueError(f"Output variables \"{variable}\" not found in file. Available output variables are: {self.getOutputVariables()}")
-    src = zipfile.ZipFile(self.f_src)
-    champions = [0 for i in range(len(locations))]
-    for i,location in enumerate(locations):
-      champions[i] = self.mesh.getPointIndexInMesh(location)
-    datas = [None for i in self.saved_time]
-    temp = np.zeros(len(locations), dtype='f8')
-    for j,timestep in enumerate(self.saved_time):
-      i = timestep[0]
-      temp[:] = np.nan
-      f = src.open(f"{self.analysis_name.replace('/','&3')}/{i:0>3d}/node.csv")
-      data = np.genfromtxt(f, delimiter=',', skip_header=1)
-      index_in_results = [int(np.argwhere(data[:,0] == x)) for x in champions]
-      datas[j] = data[index_in_results,variable_index]
-      f.close()
-    final_datas = np.array(datas)
-    src.close()
-    X = np.zeros_like(final_datas) + np.array([x[1] for x in self.saved_time])[:,None]
+    variables = [variable] if isinstance(variable, str) else list(variable)
+    #check if variables are output and get their index
+    header = self.getOutputVariables()
+    for var in variables:
+      if var not in header:
+        raise ValueError(f"Output variables \"{var}\" not found in file. Available output variables are: {header}")
+    variable_indices = [header.index(var) for var in variables]
+    if interpolation == "nearest":
+      champions, distances = self.mesh.getPointIndicesInMesh(locations)
+      nodes, weights = champions[:,None], np.ones((len(champions),1))
+    elif interpolation == "linear":
+      elements, nodes, weights = self.mesh.getInterpolationWeights(locations)
+      outside = elements == -1
+      if np.any(outside):
+        warnings.warn(f"Locations {np.asarray(locations)[outside].tolist()} are not inside a mesh element, take the value at the closest node instead", UserWarning)
+        champions, distances = self.mesh.getPointIndicesInMesh(np.asarray(locations)[outside])
+        nodes[outside] = 0
+        nodes[outside,0] = champions
+        weights[outside] = 0.
+        weights[outside,0] = 1.
+    else:
+      raise ValueError(f"Unknown interpolation \"{interpolation}\", must be \"nearest\" or \"linear\"")
+    # read only the nodes needed and interpolate all the timesteps at once
+    unique_nodes, inverse = np.unique(nodes, return_inverse=True)
+    inverse = inverse.reshape(nodes.shape)
+    times = np.array([x[1] for x in self.saved_time])
+    node_datas = np.zeros((len(self.saved_time), len(unique_nodes), len(variables)), dtype='f8')
+    cache = self.__getCache__()
+    if cache is not None and all([cache.getArray(var) is not None for var in variables]):
+      for k,var in enumerate(variables):
+        node_datas[:,:,k] = readStoredNodes(cache.getArray(var), unique_nodes)
+    else:
+      steps = [x[0] for x in self.saved_time]
+      rows = self.__mapSteps__(lambda step: self.__readNodeRows__(step, unique_nodes), steps)
+      for j,data in enumerate(rows):
+        node_datas[j] = data[:,variable_indices]
+    w = weights[None,:,:,None]
+    final_datas = np.sum(np.where(w != 0., node_datas[:,inverse,:] * w, 0.), axis=2)
+    if not isinstance(variable, str):
+      return times, final_datas
+    final_datas = final_datas[:,:,0]
+    X = np.zeros_like(final_datas) + times[:,None]
     Y = final_datas
     if len(locations) == 1:
       X = X.squeeze()
       Y = Y.squeeze()
     return X,Y
+
+  def getConvergenceHistory(self):
+    """
+    Return the convergence history of the solver at every saved step, read from the iteration summary written in each step folder (the intermediate node files are not read).
+    Iterations are numbered from the start of the step, a gap in the numbering marks the restart of the iterations on a smaller sub-step.
+    
+    :return: One record per iteration with fields ``Step``, ``Time``, ``Iteration`` and the number of unconverged nodes of each variable (e.g. ``PressureHeadUnconvNodes``)
+    :rtype: numpy structured array
+    """
+    steps = self.archive.getSteps(self.folder, "iteration.csv")
+    if not steps:
+      raise ValueError(f"No convergence history for analysis \"{self.analysis_name}\" in {self.f_src}. Was the analysis solved?")
+    times = dict(self.saved_time)
+    names = [self.__getResultFile__(step, "iteration.csv") for step in steps]
+    data = list(self.__mapSteps__(lambda name: readCsv(self.archive.read(name)), names))
+    header = data[0][0]
+    dtype = [("Step", 'i8'), ("Time", 'f8'), ("Iteration", 'i8')] + [(x, 'f8') for x in header[1:]]
+    history = np.zeros(sum([len(x[1]) for x in data]), dtype=dtype)
+    i = 0
+    for step, (h, ids, values) in zip(steps, data):
+      rows = slice(i, i+len(ids))
+      history["Step"][rows] = step
+      history["Time"][rows] = times.get(step, np.nan)
+      history["Iteration"][rows] = ids
+      for j, var in enumerate(h[1:]):
+        history[var][rows] = values[:,j]
+      i += len(ids)
+    return history
+
+  def getStepIterations(self, max_iterations=None):
+    """
+    Return the number of iterations of every computed step (saved or not) from the time summary of the analysis, and flag the steps which needed many iterations to converge.
+    
+    :param max_iterations: Flag the steps with more iterations than this number (optional, default flag steps with more than twice the median number of iterations)
+    :type max_iterations: int
+    :return: One record per step with fields ``Step``, ``Time``, ``StepIterationCount``, the other columns of the summary (e.g. ``PressureHeadUnconvNodes`` at the end of the step) and ``Flagged``
+    :rtype: numpy structured array
+    """
+    name = self.archive.getMember(self.folder, None, "time.csv")
+    if name is None:
+      raise ValueError(f"No time summary for analysis \"{self.analysis_name}\" in {self.f_src}. Was the analysis solved?")
+    header, ids, values = readCsv(self.archive.read(name))
+    computed = ~np.isnan(values[:,header.index("StepIterationCount")-1]) #initial condition is not computed
+    dtype = [("Step", 'i8'), ("Time", 'f8'), ("StepIterationCount", 'i8')]
+    dtype += [(x, 'f8') for x in header if x not in ["Step", "Time", "StepIterationCount"]]
+    dtype += [("Flagged", '?')]
+    out = np.zeros(np.count_nonzero(computed), dtype=dtype)
+    out[header[0]] = ids[computed]
+    for j, var in enumerate(header[1:]):
+      out[var] = values[computed,j]
+    counts = out["StepIterationCount"]
+    if max_iterations is None:
+      max_iterations = 2 * np.median(counts) if len(counts) else 0
+    out["Flagged"] = counts > max_iterations
+    return out
+
+  def __getResultFile__(self, step, kind="node.csv"):
+    """
+    Return the name of the result file of the given step in the study, raise an error if not found.
+    
+    :meta private:
+    """
+    name = self.archive.getMember(self.folder, step, kind)
+    if name is None:
+      hint = " Slip surface results are accessed with analysis[\"SlopeResults\"]." if self.analysis["Kind"] == "SLOPE/W" else ""
+      raise ValueError(f"No result file \"{kind}\" for step {step} of analysis \"{self.analysis_name}\" in {self.f_src}. Was the analysis solved?{hint}")
+    return name
+
+  def __getKindFile__(self, kind):
+    """
+    Return the name of the result file of a kind of results.
+    
+    :meta private:
+    """
+    if kind not in RESULT_KINDS:
+      raise ValueError(f"Unknown kind of results \"{kind}\", must be one of {list(RESULT_KINDS)}")
+    return RESULT_KINDS[kind]
+
+  def __getRowCount__(self, kind):
+    """
+    Return the number of rows of a kind of results according to the mesh (nodes, elements or element nodes).
+    
+    :meta private:
+    """
+    if kind == "element":
+      return len(self.mesh.element_offsets) - 1
+    if kind == "elementnode":
+      return len(self.mesh.element_nodes)
+    return len(self.mesh.points)
+
+  def __readNodeRows__(self, step, nodes, kind="node"):
+    """
+    Read the rows of the given nodes (0 based index) in the node result file of the given step (or elements or element nodes in the result file of the given kind).
+    Use the ``.csvidx`` row index written by GeoStudio to seek to the rows directly and fall back to a full read if absent.
+    Rows of nodes without results are filled with NaN.
+    
+    :meta private:
+    """
+    ids = np.asarray(nodes, dtype='i8') + 1
+    kind_file = self.__getKindFile__(kind)
+    f_idx = self.archive.getMember(self.folder, step, kind_file + "idx")
+    if f_idx is None:
+      all_data = self.__readNodeFile__(step, kind)
+      data = np.zeros((len(ids), all_data.shape[1])) + np.nan
+      found = (ids > 0) & (ids <= len(all_data))
+      data[found] = all_data[ids[found]-1]
+      return data
+    with self.archive.openMember(self.__getResultFile__(step, kind_file)) as f:
+      index = readCsvIndex(self.archive.read(f_idx))
+      data = readCsvRows(f, getRowOffsets(index, ids), len(self.getOutputVariables(kind)))
+    return data
+
+  def __readNodeFile__(self, step, kind="node"):
+    """
+    Read the whole node result file of the given step (or the result file of the given kind).
+    Return an array with one row per mesh node ordered by node ID and one column per output variable, nodes without results are filled with NaN.
+    
+    :meta private:
+    """
+    with self.archive.openMember(self.__getResultFile__(step, self.__getKindFile__(kind))) as f:
+      header, ids, values = readCsv(f)
+    return nodeArray(ids, values, self.__getRowCount__(kind))
+
+  def __mapSteps__(self, func, steps):
+    """
+    Yield func(step) for the given steps in order, computed concurrently by batches of steps in the thread pool if workers were set.
+    
+    :meta private:
+    """
+    steps = list(steps)
+    if self.n_workers <= 1 or len(steps) <= 1:
+      for step in steps:
+        yield func(step)
+      return
+    if self.executor is None:
+      self.executor = ThreadPoolExecutor(self.n_workers)
+    size = max(1, min(STEP_BATCH_SIZE, len(steps) // self.n_workers))
+    batches = [steps[i:i+size] for i in range(0, len(steps), size)]
+    for batch in mapOrdered(self.executor, lambda batch: [func(step) for step in batch], batches, 2*self.n_workers):
+      yield from batch
+
+  def __readNodeFiles__(self, steps, kind="node"):
+    """
+    Yield the whole node result file of the given steps in order (see ``__readNodeFile__``), read concurrently if workers were set.
+    
+    :meta private:
+    """
+    yield from self.__mapSteps__(lambda step: self.__readNodeFile__(step, kind), steps)
   
-  def exportAllResultsVTU(self, path):
+  def exportAllResultsVTU(self, path, variables=None, compress=True, verbose=True):
     """
-    Export all the results of the analysis for post-processing with Paraview software. Export is handle by MeshIO.
+    Export all the results of the analysis for post-processing with Paraview software.
+    One VTU file is written per saved time (``path.000``, ``path.001``, ...) with a ParaView collection file ``path.pvd`` gathering them with their time.
+    Results are read in a single pass over the study and data are written in binary (zlib compressed by default), the mesh being encoded only once.
     
-    :param path: Path to the output file
+    :param path: Path to the output files
     :type path: str
+    :param variables: Name of the variables to export (optional, default all)
+    :type variables: list of str
+    :param compress: Compress the data with zlib (optional, default ``True``)
+    :type compress: bool
+    :param verbose: Print the export throughput (optional, default ``True``)
+    :type verbose: bool
     """
-    try:
-      import meshio
-    except:
-      raise RuntimeError("Please install MeshIO to use this capability")
-    
-    points, cells = self.mesh.asMeshIOData()
-    for i,timestep in enumerate(self.saved_time):
-      t = timestep[1]
-      point_data = {variable:self.getSnapshot(variable, t) for variable in self.getOutputVariables()}
-      out_mesh = meshio.Mesh(points=points, cells=cells, point_data=point_data)
-      out_mesh.write(path+f".{i:0>3d}", file_format="vtu")
+    self.__exportSeries__(VTUSeriesWriter(path, compress=compress), variables, verbose)
     return
     
-  def exportAllResultsXDMF(self, path):
+  def exportAllResultsXDMF(self, path, variables=None, verbose=True):
     """
-    Export all the results (all timestep) of the analysis for post-processing. Export is handle by MeshIO.
+    Export all the results (all timestep) of the analysis for post-processing in XDMF format.
+    The mesh and the results are written in a HDF5 file next to the XDMF file, the mesh only once. Requires h5py.
     
-    :param path: Path to the output file
+    :param path: Path to the output file (``.xdmf`` extension is optional)
     :type path: str
+    :param variables: Name of the variables to export (optional, default all)
+    :type variables: list of str
+    :param verbose: Print the export throughput (optional, default ``True``)
+    :type verbose: bool
+    """
+    self.__exportSeries__(XDMFSeriesWriter(path), variables, verbose)
+    return
+  
+  def __exportSeries__(self, writer, variables, verbose):
+    """
+    Write the mesh then the results of every saved time with the given series writer.
+    
     :meta private:
     """
-    try:
-      import meshio, h5py
-    except:
-      raise RuntimeError("Please install MeshIO and h5py to use this capability")
-    
-    points, cells = self.mesh.asMeshIOData()
-    with meshio.xdmf.TimeSeriesWriter(path) as writer:
-      writer.write_points_cells(points, cells)
-      for timestep in self.saved_time:
-        t = timestep[1]
-        point_data = {variable:self.getSnapshot(variable, t) for variable in self.getOutputVariables()}
-        writer.write_data(t, point_data=point_data)
+    start = perf_counter()
+    n_steps = 0
+    with writer:
+      writer.writeMesh(self.mesh.points, self.mesh.triangles, self.mesh.quads)
+      for t,point_data in self.iterSnapshots(variables):
+        writer.writeStep(t, point_data)
+        n_steps += 1
+    elapsed = max(perf_counter() - start, 1e-9)
+    if verbose:
+      print(f"Exported {n_steps} steps of analysis \"{self.analysis_name}\" in {elapsed:.2f} s ({n_steps/elapsed:.1f} steps/s, {writer.n_bytes/elapsed/2**20:.1f} MB/s)")
     return
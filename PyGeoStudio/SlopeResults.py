@@ -0,0 +1,178 @@
+# This file is part of PyGeoStudio, an interface to GeoStudio
+# hydrogeotechnical software.
+# Copyright (C) 2024, Moïse Rousseau
+#
+# PyGeoStudio is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PyGeoStudio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import numpy as np
+
+from .Archive import Archive
+from .csv_reader import readCsv, readCsvRecords
+
+FOS_ERROR_CODE = 990 #factors of safety above are error codes of the solver (e.g. 994 no valid solution)
+
+SLIP_DATA_FILES = {
+  "column" : ["column", "slice"], #older versions write slices instead of columns
+  "intercolumn" : ["intercolumn", "interslice"],
+  "lambdafos" : ["lambdafos"],
+  "mobilizedsheardirectionfos" : ["mobilizedsheardirectionfos"],
+}
+
+def getCriticalSlip(slips):
+  """
+  Return the index of the slip surface with the minimum factor of safety in the slip surface records, ignoring the error codes of the solver. Return None if no slip surface is valid.
+
+  :param slips: Slip surface records as returned by ``SlopeResults.getSlipSurfaces``
+  :type slips: numpy structured array
+  :rtype: int
+  """
+  fos = np.where(slips["SlipFOS"] < FOS_ERROR_CODE, slips["SlipFOS"], np.nan)
+  if np.all(np.isnan(fos)):
+    return None
+  return int(np.nanargmin(fos))
+
+
+class SlopeResults:
+  """
+  Interface to the results of a limit equilibrium (SLOPE/W) analysis.
+
+  The trial slip surfaces of each step are read from the study at the first access and kept in memory.
+  The detailed data (columns, intercolumn forces, factor of safety versus lambda) are written by the solver only for some slip surfaces (usually the critical one) and are read on demand.
+
+  :param f_src: The GeoStudio study (path or opened archive)
+  :type f_src: str or Archive
+  :param analysis: The analysis
+  :type analysis: Analysis object
+  """
+  def __init__(self, f_src, analysis):
+    self.archive = f_src if isinstance(f_src, Archive) else Archive(f_src)
+    self.f_src = self.archive.f_src
+    self.analysis = analysis
+    self.analysis_name = analysis["Name"]
+    self.folder = self.analysis_name.replace('/','&3')
+    self.slips = {} #slip surfaces read, indexed by step
+    self.slips_stat = None
+    return
+
+  def getSteps(self):
+    """
+    Return the steps of the analysis with slip surface results. Stability analyses over time (using pore pressures of a transient analysis) have one step per time.
+
+    :rtype: list of int
+    """
+    return self.archive.getSteps(self.folder, "slip_surface.csv")
+
+  def getStepTimes(self):
+    """
+    Return the time of each step with slip surface results (NaN if the analysis is not defined over time).
+
+    :rtype: numpy array
+    """
+    steps = self.getSteps()
+    name = self.archive.getMember(self.folder, None, "imported_water_time.csv")
+    if name is None:
+      return np.full(len(steps), np.nan)
+    header, ids, values = readCsv(self.archive.read(name))
+    times = dict(zip(values[:,header.index("Step")-1], values[:,header.index("Time")-1]))
+    return np.array([times.get(step, np.nan) for step in steps])
+
+  def __getStep__(self, step):
+    """
+    Return the given step, or the last step with results if None.
+
+    :meta private:
+    """
+    steps = self.getSteps()
+    if not steps:
+      raise ValueError(f"No slip surface results for analysis \"{self.analysis_name}\" in {self.f_src}. Was the analysis solved?")
+    if step is None:
+      return steps[-1]
+    if step not in steps:
+      raise ValueError(f"No slip surface results at step {step} of analysis \"{self.analysis_name}\". Steps with results are: {steps}")
+    return step
+
+  def getSlipSurfaces(self, step=None):
+    """
+    Return all the trial slip surfaces of a step, with their factor of safety, geometry and forces.
+    Factors of safety above 990 are error codes of the solver for surfaces without valid solution.
+
+    :param step: Step of the analysis (optional, default the last step)
+    :type step: int
+    :return: One record per slip surface, with fields named after the columns of the solver output (``SlipNum``, ``SlipFOS``, ``SlipCenterX``, ...)
+    :rtype: numpy structured array
+    """
+    step = self.__getStep__(step)
+    if self.slips_stat != self.archive.stat:
+      self.slips = {} #study changed on disk
+      self.slips_stat = self.archive.stat
+    if step not in self.slips:
+      name = self.archive.getMember(self.folder, step, "slip_surface.csv")
+      self.slips[step] = readCsvRecords(self.archive.read(name))
+    return self.slips[step]
+
+  def getCriticalSlipSurface(self, step=None):
+    """
+    Return the slip surface with the minimum factor of safety.
+
+    :param step: Step of the analysis (optional, default the last step)
+    :type step: int
+    :return: The number of the critical slip surface and its factor of safety (None and NaN if no slip surface is valid)
+    :rtype: int, float
+    """
+    slips = self.getSlipSurfaces(step)
+    i = getCriticalSlip(slips)
+    if i is None:
+      return None, np.nan
+    return int(slips["SlipNum"][i]), float(slips["SlipFOS"][i])
+
+  def getSlipDataSurfaces(self, step=None):
+    """
+    Return the slip surfaces for which detailed data (columns, intercolumn forces, ...) were written by the solver.
+
+    :param step: Step of the analysis (optional, default the last step)
+    :type step: int
+    :rtype: list of int
+    """
+    step = self.__getStep__(step)
+    prefixes = [x for v in SLIP_DATA_FILES.values() for x in v]
+    nums = set()
+    for kind in self.archive.members.get(self.folder, {}).get(step, {}):
+      prefix, _, num = kind[:-4].rpartition('_')
+      if kind.endswith(".csv") and num.isdigit() and prefix in prefixes:
+        nums.add(int(num))
+    return sorted(nums)
+
+  def getSlipData(self, kind, slip_num=None, step=None):
+    """
+    Read detailed data of a slip surface. Only the requested file is read from the study.
+
+    :param kind: Kind of data, ``column`` (column or slice data), ``intercolumn`` (intercolumn or interslice forces), ``lambdafos`` (factor of safety versus lambda) or ``mobilizedsheardirectionfos``
+    :type kind: str
+    :param slip_num: Number of the slip surface (optional, default the critical slip surface)
+    :type slip_num: int
+    :param step: Step of the analysis (optional, default the last step)
+    :type step: int
+    :return: One record per column, intercolumn or lambda value, with fields named after the columns of the solver output
+    :rtype: numpy structured array
+    """
+    if kind not in SLIP_DATA_FILES:
+      raise ValueError(f"Unknown slip surface data \"{kind}\", must be one of {list(SLIP_DATA_FILES)}")
+    step = self.__getStep__(step)
+    if slip_num is None:
+      slip_num = self.getCriticalSlipSurface(step)[0]
+    for prefix in SLIP_DATA_FILES[kind]:
+      name = self.archive.getMember(self.folder, step, f"{prefix}_{slip_num}.csv")
+      if name is not None:
+        return readCsvRecords(self.archive.read(name))
+    raise ValueError(f"No {kind} data for slip surface {slip_num} at step {step} of analysis \"{self.analysis_name}\". Slip surfaces with data are: {self.getSlipDataSurfaces(step)}")
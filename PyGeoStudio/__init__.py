@@ -7,6 +7,8 @@ from .Reinforcement import Reinforcement
 from .Mesh import Mesh
 from .Function import Function
 from .Results import Results
+from .SlopeResults import SlopeResults
 from .utils import *
+from .ParametricSweep import ParametricSweep
 from .Color import Color
 from .builtin_functions import *
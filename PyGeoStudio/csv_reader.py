@@ -0,0 +1,170 @@
+# This file is part of PyGeoStudio, an interface to GeoStudio
+# hydrogeotechnical software.
+# Copyright (C) 2024, Moïse Rousseau
+#
+# PyGeoStudio is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PyGeoStudio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import numpy as np
+import io
+
+
+def readCsvIndex(raw):
+  """
+  Decode the content of a GeoStudio ``.csvidx`` file.
+
+  The index is an array of little-endian unsigned 32 bits integers.
+  Entry ``i`` (``i >= 1``) is the byte offset of the row with ID ``i`` in the sibling ``.csv`` file, or 0 if this ID is not written.
+  The first entry is not an offset and must be ignored.
+
+  :param raw: Content of the ``.csvidx`` file
+  :type raw: bytes
+  :return: The row offsets indexed by ID
+  :rtype: numpy array
+  """
+  return np.frombuffer(raw, dtype='<u4')
+
+def getRowOffsets(index, ids):
+  """
+  Return the byte offsets of the rows with the given IDs.
+
+  :param index: Row offsets as returned by ``readCsvIndex``
+  :type index: numpy array
+  :param ids: IDs of the rows (1 based)
+  :type ids: Iterable of int
+  :return: Offsets of the rows, 0 if the ID is not written in the CSV file
+  :rtype: numpy array
+  """
+  ids = np.asarray(ids, dtype='i8')
+  offsets = np.zeros(len(ids), dtype='i8')
+  valid = (ids > 0) & (ids < len(index))
+  offsets[valid] = index[ids[valid]]
+  return offsets
+
+def readCsvRows(f, offsets, n_col=None):
+  """
+  Read and parse the rows starting at the given byte offsets in a CSV file.
+  Rows are visited by increasing offsets so the file is read forward only once and not further than the last row requested.
+
+  :param f: CSV file opened in binary mode (must support ``seek``)
+  :type f: file object
+  :param offsets: Byte offsets of the rows to read. Offset 0 (the header) denotes a missing row.
+  :type offsets: Iterable of int
+  :param n_col: Number of columns (optional, default deduced from the longest row read)
+  :type n_col: int
+  :return: The rows parsed as float in the order given by ``offsets``, missing rows are filled with NaN
+  :rtype: numpy array (2D)
+  """
+  offsets = np.asarray(offsets, dtype='i8')
+  lines = [None for x in offsets]
+  for i in np.argsort(offsets, kind="stable"):
+    if offsets[i] <= 0: continue
+    f.seek(offsets[i])
+    lines[i] = f.readline()
+  if n_col is None:
+    n_col = max([x.count(b',')+1 for x in lines if x is not None], default=1)
+  missing = b','.join([b"nan" for i in range(n_col)])
+  lines = [missing if x is None else x for x in lines]
+  return parseCsvLines(lines, n_col)
+
+def parseCsvLines(lines, n_col=None):
+  """
+  Parse CSV lines holding numerical values only.
+
+  :param lines: The lines to parse (without header)
+  :type lines: list of bytes
+  :param n_col: Number of columns (optional, default deduced from the first line)
+  :type n_col: int
+  :return: The parsed values
+  :rtype: numpy array (2D)
+  """
+  return parseCsvText(b'\n'.join([x.rstrip() for x in lines]), n_col)
+
+def parseCsvText(text, n_col=None):
+  """
+  Parse a block of CSV text holding numerical values only.
+  All the values are tokenized and converted at once by NumPy.
+  Empty fields are read as NaN and rows shorter than the others are padded with NaN.
+
+  :param text: The CSV content to parse (without header)
+  :type text: bytes
+  :param n_col: Number of columns (optional, default deduced from the first line)
+  :type n_col: int
+  :return: The parsed values
+  :rtype: numpy array (2D)
+  """
+  text = text.strip()
+  if n_col is None:
+    end = text.find(b'\n')
+    n_col = text[:end if end != -1 else len(text)].count(b',') + 1
+  if not text:
+    return np.zeros((0,n_col), dtype='f8')
+  text = text.replace(b'\r', b'')
+  # count the fields of each row
+  chars = np.frombuffer(text, dtype='u1')
+  n_commas = np.cumsum(chars == ord(','))
+  n_commas = np.diff(n_commas[np.flatnonzero(chars == ord('\n'))], prepend=0, append=n_commas[-1])
+  n_rows = len(n_commas)
+  n_fields = n_commas[0] + 1
+  # fast path, all rows have the same number of fields and every field is a number
+  if np.all(n_commas == n_fields - 1):
+    try:
+      values = np.loadtxt(io.BytesIO(text), delimiter=',', dtype='f8', ndmin=2)
+    except ValueError: #empty fields
+      values = None
+    if values is not None and values.shape == (n_rows, n_fields):
+      out = np.empty((n_rows,max(n_col,n_fields)), dtype='f8')
+      out[:,:n_fields] = values
+      out[:,n_fields:] = np.nan
+      return out
+  # slow path, convert the tokens with empty fields replaced by NaN
+  n_col = max(n_col, n_commas.max() + 1)
+  out = np.empty((n_rows,n_col), dtype='f8')
+  tokens = [x.split(b',') for x in text.split(b'\n')]
+  tokens = [x + [b""] * (n_col-len(x)) for x in tokens]
+  tokens = np.char.strip(np.array(tokens, dtype='S'))
+  out[:] = np.where(tokens == b"", b"nan", tokens).astype('f8')
+  return out
+
+def readCsv(f):
+  """
+  Read a GeoStudio CSV file.
+  These files have a header line with the column names, then the integer ID of the record (node, element, ...) in the first column and floating point values in the others.
+
+  :param f: CSV file opened in binary mode, or its content
+  :type f: file object or bytes
+  :return: The column names, the IDs and the values of the remaining columns
+  :rtype: list of str, numpy array (int), numpy array (float, 2D)
+  """
+  raw = f if isinstance(f, bytes) else f.read()
+  end = raw.find(b'\n')
+  if end == -1: end = len(raw)
+  header = raw[:end].decode().rstrip().split(',')
+  data = parseCsvText(raw[end+1:], len(header))
+  return header, data[:,0].astype('i8'), data[:,1:]
+
+def readCsvRecords(f):
+  """
+  Read a GeoStudio CSV file as a structured array with one field per column, named after the header.
+  The first column (the ID) is read as integer and the others as float.
+
+  :param f: CSV file opened in binary mode, or its content
+  :type f: file object or bytes
+  :rtype: numpy structured array
+  """
+  header, ids, values = readCsv(f)
+  records = np.zeros(len(ids), dtype=[(header[0], 'i8')] + [(x, 'f8') for x in header[1:]])
+  records[header[0]] = ids
+  for i, name in enumerate(header[1:]):
+    records[name] = values[:,i]
+  return records
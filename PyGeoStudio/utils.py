@@ -16,7 +16,7 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 import subprocess
-import os, pathlib, sys
+import os, pathlib, shlex, sys
 import PyGeoStudio
 
 
@@ -24,7 +24,8 @@ def getGeoStudioVersion():
   """
   Test if PyGeoStudio is able to launch GeoStudio. GeoStudio executables should be on the system path.
   By default, the path ``C:\Program Files\Seequent\GeoStudio 20XX,Y`` are appended, so it directly finds the lastest GeoStudio version if not found in system path.
-  """mmon_path = [
+  """
+  common_path = [
     "C:/Program Files/Seequent/GeoStudio 2024.2/Bin/",
     "C:/Program Files/Seequent/GeoStudio 2024.1/Bin/",
     "C:/Program Files/Seequent/GeoStudio 2023.1/Bin/",
@@ -47,26 +48,33 @@ def getGeoStudioVersion():
     raise ValueError(error_message)
   return version
 
-def run(geofile, analyses_to_solve=None, shell=True, check_output=True):
+def run(geofile, analyses_to_solve=None, shell=True, check_output=True, solver="GeoCmd.exe"):
   """
   Call GeoStudio solver to run the analyses defined in the GeoStudio file
   
   :param geofile: The GeoStudio file to run (path or opened study)
   :type geofile: GeoStudioFile object or str
-  :param analyses_to_solve: A list of the analysis to run (optional, default all analyses)
-  :type analyses_to_solve: list of PyGeoStudio.Analysis object
-  :param shell: Show the console (optional, ``True`` by default)
+  :param analyses_to_solve: A list of the analysis (or analysis name) to run (optional, default all analyses)
+  :type analyses_to_solve: list of PyGeoStudio.Analysis object or str
+  :param shell: Show the console (optional, ``True`` by default). Outside Windows, the command is quoted and passed to the shell as a single string.
   :type shell: bool
   :param check_output: Check if GeoStudio solver successfully solved the analysis
   :type check_output: bool
+  :param solver: Command of the solver, called with the study, the name of the analyses to solve and ``/solve`` as arguments (optional, default ``GeoCmd.exe``). A list is interpreted as a command with its first arguments (e.g. ``[sys.executable, "my_solver.py"]``).
+  :type solver: str or list of str
   """
   if isinstance(geofile, PyGeoStudio.GeoStudioFile):
-    geofile = pathlib.PureWindowsPath(geofile.f_src)
+    geofile.close() #release the study so the solver can write the results
+    geofile = geofile.f_src
+  geofile = str(pathlib.Path(geofile))
   if analyses_to_solve is not None:
-    analyses_to_solve_name = [x["Name"] for x in analyses_to_solve]
+    analyses_to_solve_name = [x if isinstance(x, str) else x["Name"] for x in analyses_to_solve]
   else:
     analyses_to_solve_name = []
-  cmd = ["GeoCmd.exe", geofile] + analyses_to_solve_name + ["/solve"]
+  solver = [solver] if isinstance(solver, str) else list(solver)
+  cmd = solver + [geofile] + analyses_to_solve_name + ["/solve"]
+  if shell and os.name != "nt":
+    cmd = " ".join(shlex.quote(x) for x in cmd) #a list would only run its first element
   print("#################################")
   print("Calling GeoStudio solver")
   cmd_out = subprocess.run(cmd, shell=shell)
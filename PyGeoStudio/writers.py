@@ -0,0 +1,292 @@
+# This file is part of PyGeoStudio, an interface to GeoStudio
+# hydrogeotechnical software.
+# Copyright (C) 2024, Moïse Rousseau
+#
+# PyGeoStudio is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PyGeoStudio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import numpy as np
+import os
+import zlib
+from xml.sax.saxutils import quoteattr
+
+
+VTK_TRIANGLE = 5
+VTK_QUAD = 9
+XDMF_TRIANGLE = 4
+XDMF_QUADRILATERAL = 5
+
+
+def splitPath(path, ext):
+  """
+  Return the path without the given extension, and the name of the file without directory.
+
+  :meta private:
+  """
+  if path.endswith(ext):
+    path = path[:-len(ext)]
+  return path, os.path.basename(path)
+
+
+class VTUSeriesWriter:
+  """
+  Write a time series of results on a mesh as VTK unstructured grid files (``.vtu``, one per time) and a ParaView collection file (``.pvd``) referencing them with their time.
+
+  Data are stored in binary in the appended section of the VTU files, optionally compressed with zlib.
+  The mesh is encoded once and the encoded bytes are reused in every file.
+
+  :param path: Path to the output collection file (``.pvd`` extension is optional). Files of each time are written next to it with the time index as extension (``path.000``, ``path.001``, ...).
+  :type path: str
+  :param compress: Compress the data with zlib (optional, default ``True``)
+  :type compress: bool
+  :param block_size: Size of the blocks of data compressed independently in bytes (optional)
+  :type block_size: int
+  """
+  def __init__(self, path, compress=True, block_size=2**20):
+    self.base, self.name = splitPath(path, ".pvd")
+    self.compress = compress
+    self.block_size = block_size
+    self.mesh_xml = None
+    self.mesh_blocks = None
+    self.n_points = 0
+    self.n_cells = 0
+    self.files = []
+    self.n_bytes = 0
+    return
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    self.close()
+    return
+
+  def __encode__(self, arr):
+    """
+    Encode an array as a data block of the appended section.
+
+    :meta private:
+    """
+    raw = np.ascontiguousarray(arr).tobytes()
+    if not self.compress:
+      return np.array([len(raw)], dtype='<u8').tobytes() + raw
+    blocks = [zlib.compress(raw[i:i+self.block_size]) for i in range(0, len(raw), self.block_size)]
+    last = len(raw) - (len(blocks)-1) * self.block_size if blocks else 0
+    header = np.array([len(blocks), self.block_size, last] + [len(x) for x in blocks], dtype='<u8')
+    return header.tobytes() + b"".join(blocks)
+
+  def writeMesh(self, points, triangles, quads):
+    """
+    Set the mesh of the series.
+
+    :param points: XYZ coordinates of the points with shape ``(n, 3)``
+    :type points: numpy array
+    :param triangles: Point indices (0 based) of the triangle cells with shape ``(n, 3)``
+    :type triangles: numpy array
+    :param quads: Point indices (0 based) of the quadrilateral cells with shape ``(n, 4)``
+    :type quads: numpy array
+    """
+    self.n_points = len(points)
+    self.n_cells = len(triangles) + len(quads)
+    connectivity = np.concatenate([np.ravel(triangles), np.ravel(quads)]).astype('<i8')
+    offsets = np.concatenate([3*np.arange(1,len(triangles)+1), 3*len(triangles) + 4*np.arange(1,len(quads)+1)]).astype('<i8')
+    types = np.concatenate([np.full(len(triangles), VTK_TRIANGLE), np.full(len(quads), VTK_QUAD)]).astype('u1')
+    arrays = [
+      ("Points", "Float64", np.asarray(points, dtype='<f8'), 3),
+      ("connectivity", "Int64", connectivity, 1),
+      ("offsets", "Int64", offsets, 1),
+      ("types", "UInt8", types, 1),
+    ]
+    self.mesh_blocks = [self.__encode__(x[2]) for x in arrays]
+    self.mesh_xml = [(name, dtype, n_comp, len(block)) for (name, dtype, arr, n_comp), block in zip(arrays, self.mesh_blocks)]
+    return
+
+  def writeStep(self, time, point_data):
+    """
+    Write the results at one time in a new VTU file.
+
+    :param time: Time of the results
+    :type time: float
+    :param point_data: Values at the mesh points indexed by variable name
+    :type point_data: dict
+    """
+    if self.mesh_blocks is None:
+      raise ValueError("The mesh must be written before the results")
+    for name, values in point_data.items():
+      if len(values) != self.n_points:
+        raise ValueError(f"Variable \"{name}\" has {len(values)} values but the mesh has {self.n_points} points")
+    f_vtu = f"{self.base}.{len(self.files):0>3d}"
+    blocks = [self.__encode__(np.asarray(x, dtype='<f8')) for x in point_data.values()]
+    offset = 0
+    xml = ['<?xml version="1.0"?>']
+    compressor = ' compressor="vtkZLibDataCompressor"' if self.compress else ''
+    xml.append(f'<VTKFile type="UnstructuredGrid" version="1.0" byte_order="LittleEndian" header_type="UInt64"{compressor}>')
+    xml.append('  <UnstructuredGrid>')
+    xml.append(f'    <Piece NumberOfPoints="{self.n_points}" NumberOfCells="{self.n_cells}">')
+    xml.append('      <PointData>')
+    for name, block in zip(point_data.keys(), blocks):
+      xml.append(f'        <DataArray type="Float64" Name={quoteattr(name)} format="appended" offset="{offset}"/>')
+      offset += len(block)
+    xml.append('      </PointData>')
+    name, dtype, n_comp, size = self.mesh_xml[0]
+    xml.append('      <Points>')
+    xml.append(f'        <DataArray type="{dtype}" NumberOfComponents="{n_comp}" format="appended" offset="{offset}"/>')
+    xml.append('      </Points>')
+    offset += size
+    xml.append('      <Cells>')
+    for name, dtype, n_comp, size in self.mesh_xml[1:]:
+      xml.append(f'        <DataArray type="{dtype}" Name="{name}" format="appended" offset="{offset}"/>')
+      offset += size
+    xml.append('      </Cells>')
+    xml.append('    </Piece>')
+    xml.append('  </UnstructuredGrid>')
+    xml.append('  <AppendedData encoding="raw">')
+    with open(f_vtu, 'wb') as f:
+      f.write(('\n'.join(xml) + '\n_').encode())
+      for block in blocks + self.mesh_blocks:
+        f.write(block)
+      f.write(b'\n  </AppendedData>\n</VTKFile>\n')
+      self.n_bytes += f.tell()
+    self.files.append((time, os.path.basename(f_vtu)))
+    return
+
+  def close(self):
+    """
+    Write the collection file referencing the VTU files written.
+    """
+    xml = ['<?xml version="1.0"?>']
+    xml.append('<VTKFile type="Collection" version="0.1" byte_order="LittleEndian">')
+    xml.append('  <Collection>')
+    for t, f in self.files:
+      xml.append(f'    <DataSet timestep="{float(t)!r}" part="0" file={quoteattr(f)}/>')
+    xml.append('  </Collection>')
+    xml.append('</VTKFile>')
+    with open(self.base + ".pvd", 'w') as f:
+      f.write('\n'.join(xml) + '\n')
+    return
+
+
+class XDMFSeriesWriter:
+  """
+  Write a time series of results on a mesh in XDMF format.
+  Heavy data are written in a single HDF5 file next to the ``.xdmf`` file (``path.h5``): the mesh once, then the values of each time as they are written.
+  The mesh is declared once in the XDMF file and included in the grid of each time.
+  Requires h5py.
+
+  :param path: Path to the output file (``.xdmf`` extension is optional)
+  :type path: str
+  """
+  def __init__(self, path):
+    try:
+      import h5py
+    except:
+      raise RuntimeError("Please install h5py to use this capability")
+    self.base, self.name = splitPath(path, ".xdmf")
+    self.h5 = h5py.File(self.base + ".h5", 'w')
+    self.xdmf = open(self.base + ".xdmf", 'w')
+    self.xdmf.write('<?xml version="1.0"?>\n<Xdmf Version="3.0" xmlns:xi="http://www.w3.org/2001/XInclude">\n  <Domain>\n')
+    self.n_points = None
+    self.n_steps = 0
+    self.n_bytes = 0
+    return
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    self.close()
+    return
+
+  def __dataItem__(self, arr, number_type, dims):
+    """
+    Write the array as a new dataset of the HDF5 file and return the XML of the data item referencing it.
+
+    :meta private:
+    """
+    arr = np.ascontiguousarray(arr)
+    name = f"data{len(self.h5)}"
+    self.h5.create_dataset(name, data=arr)
+    return f'<DataItem Format="HDF" NumberType="{number_type}" Precision="{arr.dtype.itemsize}" Dimensions="{dims}">{self.name}.h5:/{name}</DataItem>'
+
+  def writeMesh(self, points, triangles, quads):
+    """
+    Set the mesh of the series.
+
+    :param points: XYZ coordinates of the points with shape ``(n, 3)``
+    :type points: numpy array
+    :param triangles: Point indices (0 based) of the triangle cells with shape ``(n, 3)``
+    :type triangles: numpy array
+    :param quads: Point indices (0 based) of the quadrilateral cells with shape ``(n, 4)``
+    :type quads: numpy array
+    """
+    if self.n_points is not None:
+      raise ValueError("The mesh of the series is already written")
+    topology = np.concatenate([
+      np.append(np.full((len(triangles),1), XDMF_TRIANGLE), triangles, axis=1).ravel(),
+      np.append(np.full((len(quads),1), XDMF_QUADRILATERAL), quads, axis=1).ravel(),
+    ]).astype('<i8')
+    n_cells = len(triangles) + len(quads)
+    xml = [
+      '<Grid Name="mesh" GridType="Uniform">',
+      f'  <Topology TopologyType="Mixed" NumberOfElements="{n_cells}">',
+      '    ' + self.__dataItem__(topology, "Int", len(topology)),
+      '  </Topology>',
+      '  <Geometry GeometryType="XYZ">',
+      '    ' + self.__dataItem__(np.asarray(points, dtype='<f8'), "Float", f"{len(points)} 3"),
+      '  </Geometry>',
+      '</Grid>',
+      '<Grid Name="TimeSeries" GridType="Collection" CollectionType="Temporal">',
+    ]
+    self.xdmf.write(''.join(['    ' + x + '\n' for x in xml]))
+    self.n_points = len(points)
+    return
+
+  def writeStep(self, time, point_data):
+    """
+    Write the results at one time.
+
+    :param time: Time of the results
+    :type time: float
+    :param point_data: Values at the mesh points indexed by variable name
+    :type point_data: dict
+    """
+    if self.n_points is None:
+      raise ValueError("The mesh must be written before the results")
+    for name, values in point_data.items():
+      if len(values) != self.n_points:
+        raise ValueError(f"Variable \"{name}\" has {len(values)} values but the mesh has {self.n_points} points")
+    xml = [
+      f'<Grid Name="Step {self.n_steps}" GridType="Uniform">',
+      '  <xi:include xpointer="xpointer(//Grid[@Name=&quot;mesh&quot;]/*[self::Topology or self::Geometry])"/>',
+      f'  <Time Value="{float(time)!r}"/>',
+    ]
+    for name, values in point_data.items():
+      xml.append(f'  <Attribute Name={quoteattr(name)} AttributeType="Scalar" Center="Node">')
+      xml.append('    ' + self.__dataItem__(np.asarray(values, dtype='<f8'), "Float", self.n_points))
+      xml.append('  </Attribute>')
+    xml.append('</Grid>')
+    self.xdmf.write(''.join(['      ' + x + '\n' for x in xml]))
+    self.n_steps += 1
+    return
+
+  def close(self):
+    """
+    Close the HDF5 file and end the XDMF file.
+    """
+    self.h5.close()
+    self.n_bytes = os.path.getsize(self.base + ".h5")
+    if self.n_points is not None:
+      self.xdmf.write('    </Grid>\n')
+    self.xdmf.write('  </Domain>\n</Xdmf>\n')
+    self.xdmf.close()
+    return
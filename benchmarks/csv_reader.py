@@ -0,0 +1,41 @@
+"""
+Compare the GeoStudio CSV reader of PyGeoStudio against ``numpy.genfromtxt``
+on the result files of the example studies bundled with PyGeoStudio.
+
+Usage: python csv_reader.py [study.gsz ...]
+"""
+
+import sys, glob, time, os
+import zipfile
+import numpy as np
+from PyGeoStudio.csv_reader import readCsv
+
+here = os.path.dirname(os.path.abspath(__file__))
+studies = sys.argv[1:] or sorted(glob.glob(os.path.join(here, "../examples/GeoStudio_files/*.gsz")))
+
+for study in studies:
+  src = zipfile.ZipFile(study)
+  # inflate once so only the parsing is timed
+  raws = [src.read(f) for f in src.namelist() if f.split('/')[-1] in ["node.csv", "element.csv", "elementnode.csv"]]
+  src.close()
+  if not raws: continue
+  n_bytes = sum([len(x) for x in raws])
+
+  t0 = time.perf_counter()
+  ref = [np.genfromtxt(raw.splitlines(), delimiter=',', skip_header=1, ndmin=2) for raw in raws]
+  t_genfromtxt = time.perf_counter() - t0
+
+  t0 = time.perf_counter()
+  new = [readCsv(raw) for raw in raws]
+  t_reader = time.perf_counter() - t0
+
+  for x, (header, ids, values) in zip(ref, new):
+    # genfromtxt ignores the columns declared in the header but never written
+    n = x.shape[1] - 1
+    assert np.array_equal(x[:,0], ids)
+    assert np.allclose(x[:,1:], values[:,:n], equal_nan=True)
+    assert np.isnan(values[:,n:]).all()
+
+  print(f"{os.path.basename(study)}: {len(raws)} files, {n_bytes/1e6:.1f} MB")
+  print(f"  numpy.genfromtxt: {t_genfromtxt:.3f} s ({n_bytes/1e6/t_genfromtxt:.1f} MB/s)")
+  print(f"  csv_reader.readCsv: {t_reader:.3f} s ({n_bytes/1e6/t_reader:.1f} MB/s), speedup x{t_genfromtxt/t_reader:.1f}")
@@ -0,0 +1,46 @@
+"""
+Time the reading of all the result steps of the analyses of a study with
+the different worker settings of ``Results.setWorkers``.
+
+Usage: python parallel_results.py [study.gsz] [max_workers]
+"""
+
+import sys, time, os
+import numpy as np
+import PyGeoStudio as pgs
+
+here = os.path.dirname(os.path.abspath(__file__))
+study = sys.argv[1] if len(sys.argv) > 1 else os.path.join(here, "../examples/GeoStudio_files/Rapid drawdown.gsz")
+max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+
+
+def readAll(results):
+  return [snapshot for t, snapshot in results.iterSnapshots()]
+
+
+if __name__ == "__main__":
+  geofile = pgs.GeoStudioFile(study)
+  for analysis in geofile.analyses:
+    results = analysis["Results"]
+    try:
+      results.getOutputVariables()
+    except ValueError:
+      continue #analysis without node results
+    n_steps = len(results.saved_time)
+    results.setWorkers(1)
+    t0 = time.perf_counter()
+    ref = readAll(results)
+    t_serial = time.perf_counter() - t0
+    print(f"{analysis['Name']}: {n_steps} steps")
+    print(f"  serial: {t_serial:.3f} s")
+    n_workers = 2
+    while n_workers <= max(max_workers, 2):
+      results.setWorkers(n_workers)
+      t0 = time.perf_counter()
+      new = readAll(results)
+      t_parallel = time.perf_counter() - t0
+      for x, y in zip(ref, new):
+        for var in x.keys():
+          assert np.array_equal(x[var], y[var], equal_nan=True)
+      print(f"  {n_workers} threads: {t_parallel:.3f} s, speedup x{t_serial/t_parallel:.2f}")
+      n_workers *= 2
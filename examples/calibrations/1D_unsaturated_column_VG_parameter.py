@@ -47,7 +47,7 @@ def run_model(xdata, new_log_Ksat, tets, a_log, n, tetr, m):
   Krel = pgs.builtin_functions.VanGenuchtenMualemK(theta, m)
   Kfunction.setYData(new_Ksat * Krel)
   # run the analysis
-  geofile.save()
+  geofile.save(results="unsolved", analyses_to_solve=[instant_drawdown])
   pgs.run(geofile, analyses_to_solve=[instant_drawdown])
   # return fitted data
   T,PWP = instant_drawdown["Results"].getVariablesVsTime("PoreWaterPressure", locations=[location])
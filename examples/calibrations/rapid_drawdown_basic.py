@@ -48,8 +48,8 @@ def run_model(xdata,new_log_Ksat):
   actual_relK = Kfunction.getYData()
   actual_Ksat = Kfunction.getYData()[0]
   Kfunction.setYData(new_Ksat/actual_Ksat * actual_relK)
-  # run the analysis
-  geofile.save()
+  # run the analysis (results of the analysis solved are dropped as the solver overwrite them)
+  geofile.save(results="unsolved", analyses_to_solve=[instant_drawdown])
   pgs.run(geofile, analyses_to_solve=[instant_drawdown])
   # return fitted data
   T,PWP = instant_drawdown["Results"].getVariablesVsTime("PoreWaterPressure", locations=[[25,2]])
@@ -8,44 +8,53 @@ Effect of saturated permeability on drawdown problem
 # The `Rapid Drawdown <https://www.geoslope.com/learning/support-resources/example-files/example?id=examples:sigmaw:rapiddrawdown&resourceVersion=23.1.0.00000>`_ example problem GeoStudio website is used.
 # The parametric study consists of analyzing the effect of the saturated hydraulic conductivity of the dam on the dissipation of the pore water pressure following a instantaneous drawdown.
 # 
-# We first import ``PyGeoStudio`` library, open the GeoStudio study and get hydraulic permeability function of the dam fill material.
+# We first import ``PyGeoStudio`` library and open the GeoStudio study.
 
 import PyGeoStudio as pgs
 
 src_file = "../GeoStudio_files/Rapid drawdown.gsz"
 geofile = pgs.GeoStudioFile(src_file)
-mat = geofile.getMaterialByName("Dam fill")
-Kfunction = mat["Hydraulic"]["KFn"]
 
 
 # %%
-# Then we define the saturated hydraulic conductivity to test in our parametric study and initiate Python list to get the results of the simulation.
+# Then we define the saturated hydraulic conductivity to test in our parametric study.
 
 Ksats = [1e-7, 1e-6, 1e-5, 1e-4]
-Ts = []
-PWPs = []
 
 # %%
-# We now enter in the parametric study loop to analyze the pore water pressure dissipation for the different ``Ksat``.
+# Each value is solved in its own copy of the study so the cases can run concurrently.
 # Note there is no way in GeoStudio to define the saturated hydraulic conductivity of the unsaturated material.
 # The saturated hydraulic conductivity is rather specified through the hydraulic function.
-# So the approach is to scale the whole conductivity function.
+# So the approach is to scale the whole conductivity function in the copy of the case:
 
-for new_Ksat in Ksats:
-  # scale hydraulic conductivity
+def setup(geofile, new_Ksat):
+  mat = geofile.getMaterialByName("Dam fill")
   mat.setSaturatedHydraulicConductivity(new_Ksat)
-  # run GeoStudio
-  geofile.save()
+
+# %%
+# Once a case is solved, we extract the pore water pressure dissipation curve at the location of interest:
+
+def extract(geofile):
   instant_drawdown = geofile.getAnalysisByName("2 - Instantaneous drawdown")
-  pgs.run(geofile, analyses_to_solve=[instant_drawdown])
-  # get results
   T,PWP = instant_drawdown["Results"].getVariablesVsTime(
     "PoreWaterPressure",
     locations=[[25,2]]
   )
-  # store it for future plotting
-  Ts.append(T)
-  PWPs.append(PWP)
+  return PWP
+
+# %%
+# We now run the parametric study, with at most 2 GeoStudio solvers running at the same time.
+# The cases are written in the ``Ksat_sweep`` folder, the original study is not modified.
+
+sweep = pgs.ParametricSweep(
+  src_file, "Ksat_sweep",
+  analyses_to_solve=["2 - Instantaneous drawdown"],
+  n_workers=2,
+)
+table = sweep.run(Ksats, setup, extract)
+T = geofile.getAnalysisByName("2 - Instantaneous drawdown")["Results"].getOutputTimes()
+Ts = [T for Ksat in Ksats]
+PWPs = table["Value"]
 
 
 # %%
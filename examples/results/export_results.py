@@ -20,9 +20,14 @@ steady_state["Results"].exportAllResultsVTU("steady_state_res.vtu")
 
 # %%
 # Exporting transient analysis will create several ``transient_res.vtu.XXX`` files, each for one timestep saved in the analysis.
+# The ``transient_res.vtu.pvd`` collection file references them with their time so Paraview loads them as a time series.
 instant_drawdown = geofile.getAnalysisByName("2 - Instantaneous drawdown") #select analysis 2
 instant_drawdown["Results"].exportAllResultsVTU("transient_res.vtu")
 
+# %%
+# The results can also be exported in XDMF format, with the mesh written only once and all the timesteps in a single HDF5 file (requires h5py):
+instant_drawdown["Results"].exportAllResultsXDMF("transient_res.xdmf")
+
 # %%
 # If only the mesh is needed, for example, to perform mesh analysis, the following command can be used:
 instant_drawdown["Geometry"]["Mesh"].export("mesh.vtk")
@@ -0,0 +1,32 @@
+import os
+import sys
+import shutil
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+STUDY_DIR = os.path.join(os.path.dirname(__file__), "..", "examples", "GeoStudio_files")
+
+
+def copyStudy(name, tmp_path):
+  """
+  Copy a study of the examples in the temporary directory and return its path.
+  """
+  f_out = str(tmp_path / name)
+  shutil.copyfile(os.path.join(STUDY_DIR, name), f_out)
+  return f_out
+
+
+@pytest.fixture
+def rapid_drawdown(tmp_path):
+  return copyStudy("Rapid drawdown.gsz", tmp_path)
+
+
+@pytest.fixture
+def column(tmp_path):
+  return copyStudy("1D_unsaturated_column.gsz", tmp_path)
+
+
+@pytest.fixture
+def anchors(tmp_path):
+  return copyStudy("Reinforcement with Anchors.gsz", tmp_path)
@@ -0,0 +1,34 @@
+import os
+import zipfile
+
+from PyGeoStudio.Archive import Archive
+import PyGeoStudio.Archive as archive_module
+
+
+def test_members_index(rapid_drawdown):
+  with Archive(rapid_drawdown) as archive:
+    assert archive.getMember("2 - Instantaneous drawdown", 1, "node.csv") == "2 - Instantaneous drawdown/001/node.csv"
+    assert archive.getMember(None, None, "mesh_1.ply") == "mesh_1.ply"
+    assert archive.getMember("2 - Instantaneous drawdown", 1, "unknown.csv") is None
+    assert archive.getSteps("2 - Instantaneous drawdown", "node.csv") == list(range(11))
+
+
+def test_stat_once(rapid_drawdown, monkeypatch):
+  calls = []
+  stat = os.stat
+  monkeypatch.setattr(archive_module.os, "stat", lambda *args, **kwargs: calls.append(args) or stat(*args, **kwargs))
+  with Archive(rapid_drawdown) as archive:
+    for step in archive.getSteps("2 - Instantaneous drawdown", "node.csv"):
+      archive.read(archive.getMember("2 - Instantaneous drawdown", step, "node.csv"))
+  assert len(calls) == 1
+
+
+def test_refresh(rapid_drawdown):
+  archive = Archive(rapid_drawdown)
+  assert archive.getMember(None, None, "new.csv") is None
+  assert not archive.refresh()
+  with zipfile.ZipFile(rapid_drawdown, 'a') as z:
+    z.writestr("new.csv", b"ID\n")
+  assert archive.refresh()
+  assert archive.getMember(None, None, "new.csv") == "new.csv"
+  archive.close()
@@ -0,0 +1,70 @@
+import csv
+import io
+import zipfile
+import numpy as np
+import pytest
+
+from PyGeoStudio.csv_reader import readCsv, readCsvIndex, getRowOffsets, readCsvRows, parseCsvText
+from conftest import STUDY_DIR
+
+
+def readMember(name, member):
+  with zipfile.ZipFile(f"{STUDY_DIR}/{name}") as z:
+    return z.read(member)
+
+
+def test_read_rows_at_offsets():
+  member = "2 - Instantaneous drawdown/001/node.csv"
+  raw = readMember("Rapid drawdown.gsz", member)
+  index = readCsvIndex(readMember("Rapid drawdown.gsz", member + "idx"))
+  header, ids, values = readCsv(raw)
+  query = np.array([ids[-1], 0, ids[0], ids[len(ids)//2], len(index) + 10, ids[0]])
+  rows = readCsvRows(io.BytesIO(raw), getRowOffsets(index, query), len(header))
+  expected = {x:row for x,row in zip(ids, values)}
+  for x, row in zip(query, rows):
+    if x in expected:
+      assert row[0] == x
+      assert np.allclose(row[1:], expected[x], equal_nan=True)
+    else:
+      assert np.all(np.isnan(row))
+
+
+def parseWithCsvModule(raw):
+  rows = list(csv.reader(io.StringIO(raw.decode())))
+  header, rows = rows[0], [x for x in rows[1:] if x]
+  values = np.array([[float(x) if x.strip() else np.nan for x in row] for row in rows])
+  return header, values[:,0].astype('i8'), values[:,1:]
+
+
+@pytest.mark.parametrize("name,member", [
+  ("Rapid drawdown.gsz", "2 - Instantaneous drawdown/001/node.csv"),
+  ("Rapid drawdown.gsz", "2 - Instantaneous drawdown/001/element.csv"),
+  ("1D_unsaturated_column.gsz", "SEEP&3W Analysis/010/node.csv"),
+])
+def test_read_csv(name, member):
+  raw = readMember(name, member)
+  header, ids, values = readCsv(raw)
+  ref_header, ref_ids, ref_values = parseWithCsvModule(raw)
+  assert header == ref_header
+  assert np.array_equal(ids, ref_ids)
+  assert np.allclose(values, ref_values, equal_nan=True)
+
+
+def test_parse_empty_and_short_rows():
+  values = parseCsvText(b"1,2.5,3\n2,,4\n3,1e-3\n", 3)
+  assert values.shape == (3,3)
+  assert np.allclose(values, [[1,2.5,3],[2,np.nan,4],[3,1e-3,np.nan]], equal_nan=True)
+
+
+@pytest.mark.parametrize("text,expected", [
+  (b"1,2.5,3", [[1,2.5,3]]),
+  (b"1,2.5,3\n", [[1,2.5,3]]),
+  (b"1,2,", [[1,2,np.nan]]),
+  (b"7", [[7]]),
+])
+def test_parse_one_row(text, expected):
+  values = parseCsvText(text)
+  assert values.shape == np.shape(expected)
+  assert np.allclose(values, expected, equal_nan=True)
+  header, ids, values = readCsv(b"ID,A,B\n" + text)
+  assert values.shape == (1,2)
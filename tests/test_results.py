@@ -0,0 +1,150 @@
+import os
+import zipfile
+import numpy as np
+import pytest
+
+import PyGeoStudio as pgs
+from PyGeoStudio.ResultCache import ResultCache
+
+ANALYSIS = "2 - Instantaneous drawdown"
+
+
+def getResults(f):
+  return pgs.GeoStudioFile(f).getAnalysisByName(ANALYSIS)["Results"]
+
+
+def swapSteps(f, step_a, step_b):
+  """
+  Rewrite the study with the node results of two steps swapped, as if the analysis was solved again.
+  """
+  folder = ANALYSIS.replace('/','&3')
+  renamed = {}
+  for ext in ["csv", "csvidx"]:
+    a, b = f"{folder}/{step_a:0>3d}/node.{ext}", f"{folder}/{step_b:0>3d}/node.{ext}"
+    renamed[a], renamed[b] = b, a
+  with zipfile.ZipFile(f) as z_in, zipfile.ZipFile(f + ".tmp", 'w', zipfile.ZIP_DEFLATED) as z_out:
+    for name in z_in.namelist():
+      z_out.writestr(name, z_in.read(renamed.get(name, name)))
+  os.replace(f + ".tmp", f)
+
+
+def test_interpolation_at_nodes(rapid_drawdown):
+  results = getResults(rapid_drawdown)
+  mesh = results.mesh
+  nodes = np.array([0, 10, 100, len(mesh.points)-1])
+  locations = mesh.points[nodes,:2]
+  T, nearest = results.getVariablesVsTime("PoreWaterPressure", locations)
+  T, linear = results.getVariablesVsTime("PoreWaterPressure", locations, interpolation="linear")
+  assert np.allclose(linear, nearest)
+  for j, (step, t) in enumerate(results.saved_time):
+    assert np.allclose(linear[j], results.getSnapshot("PoreWaterPressure", time=t)[nodes])
+
+
+def test_interpolation_weights(rapid_drawdown):
+  mesh = getResults(rapid_drawdown).mesh
+  centers = np.concatenate([mesh.points[mesh.triangles,:2].mean(axis=1), mesh.points[mesh.quads,:2].mean(axis=1)])
+  elements, nodes, weights = mesh.getInterpolationWeights(centers)
+  assert np.array_equal(elements, np.append(mesh.triangle_index, mesh.quad_index))
+  assert np.allclose(weights.sum(axis=1), 1)
+
+
+def test_mesh_cache(rapid_drawdown, tmp_path, monkeypatch):
+  cache_dir = str(tmp_path / "meshes")
+  ref = pgs.GeoStudioFile(rapid_drawdown, mesh_cache=cache_dir).meshes[0]
+  assert os.listdir(cache_dir)
+  def parse(mesh):
+    raise AssertionError("Mesh parsed instead of read from the cache")
+  monkeypatch.setattr(pgs.Mesh, "__buildConnectivity__", parse)
+  mesh = pgs.GeoStudioFile(rapid_drawdown, mesh_cache=cache_dir).meshes[0]
+  assert mesh.ply is None
+  for name in pgs.Mesh.cached_arrays:
+    assert np.array_equal(getattr(mesh, name), getattr(ref, name))
+
+
+def test_result_store(rapid_drawdown, tmp_path, monkeypatch):
+  store = str(tmp_path / "store")
+  results = getResults(rapid_drawdown)
+  snapshots = [results.getSnapshot("PoreWaterPressure", time=t) for step,t in results.saved_time]
+  results.buildCache(store)
+  arr = results.getResultArray("PoreWaterPressure")
+  assert arr.shape == (len(snapshots), len(snapshots[0]))
+  for j, snapshot in enumerate(snapshots):
+    assert np.allclose(arr[j], snapshot)
+  # the store of the same results is reused
+  def build(cache, results, members):
+    raise AssertionError("Store built again")
+  with monkeypatch.context() as m:
+    m.setattr(ResultCache, "build", build)
+    results = getResults(rapid_drawdown)
+    results.buildCache(store)
+    assert np.allclose(results.getResultArray("PoreWaterPressure")[0], snapshots[0])
+
+
+def test_result_store_invalidation(rapid_drawdown, tmp_path):
+  store = str(tmp_path / "store")
+  results = getResults(rapid_drawdown)
+  (step_a, t_a), (step_b, t_b) = results.saved_time[:2]
+  snapshot_a = results.getSnapshot("PoreWaterPressure", time=t_a)
+  snapshot_b = results.getSnapshot("PoreWaterPressure", time=t_b)
+  assert not np.allclose(snapshot_a, snapshot_b)
+  results.buildCache(store)
+  results.archive.close()
+  swapSteps(rapid_drawdown, step_a, step_b)
+  with pytest.warns(UserWarning, match="out of date"):
+    assert np.allclose(results.getSnapshot("PoreWaterPressure", time=t_a), snapshot_b)
+  with pytest.raises(ValueError):
+    results.getResultArray("PoreWaterPressure")
+  results.buildCache(store)
+  assert np.allclose(results.getResultArray("PoreWaterPressure")[0], snapshot_b)
+  assert np.allclose(results.getResultArray("PoreWaterPressure")[1], snapshot_a)
+
+
+def test_workers(rapid_drawdown):
+  results = getResults(rapid_drawdown)
+  ref = [snapshot for t, snapshot in results.iterSnapshots()]
+  T, ref_history = results.getVariablesVsTime("PoreWaterPressure", [[25,2]])
+  results.setWorkers(3)
+  for j, (t, snapshot) in enumerate(results.iterSnapshots()):
+    for var in snapshot:
+      assert np.array_equal(snapshot[var], ref[j][var], equal_nan=True)
+  executor = results.executor
+  assert executor is not None
+  T, history = results.getVariablesVsTime("PoreWaterPressure", [[25,2]])
+  assert np.array_equal(history, ref_history)
+  assert results.executor is executor #pool kept between reads
+  results.setWorkers(1)
+  assert results.executor is None
+
+
+def test_export_vtu(rapid_drawdown, tmp_path):
+  meshio = pytest.importorskip("meshio")
+  results = getResults(rapid_drawdown)
+  path = str(tmp_path / "results.vtu")
+  results.exportAllResultsVTU(path, verbose=False)
+  assert os.path.isfile(path + ".pvd")
+  mesh = results.mesh
+  for j, (step, t) in enumerate(results.saved_time):
+    vtu = meshio.read(f"{path}.{j:0>3d}", file_format="vtu")
+    assert np.allclose(vtu.points[:,:2], mesh.points[:,:2])
+    assert sum([len(x.data) for x in vtu.cells]) == len(mesh.triangles) + len(mesh.quads)
+    assert np.allclose(vtu.point_data["PoreWaterPressure"], results.getSnapshot("PoreWaterPressure", time=t))
+
+
+def test_export_xdmf(rapid_drawdown, tmp_path):
+  meshio = pytest.importorskip("meshio")
+  pytest.importorskip("h5py")
+  results = getResults(rapid_drawdown)
+  path = str(tmp_path / "results.xdmf")
+  results.exportAllResultsXDMF(path, verbose=False)
+  assert sorted(os.listdir(tmp_path)) == sorted([os.path.basename(rapid_drawdown), "results.h5", "results.xdmf"])
+  with open(path) as f:
+    assert f.read().count("<Geometry") == 1
+  with meshio.xdmf.TimeSeriesReader(path) as reader:
+    points, cells = reader.read_points_cells()
+    assert np.allclose(points[:,:2], results.mesh.points[:,:2])
+    assert sum([len(x.data) for x in cells]) == len(results.mesh.triangles) + len(results.mesh.quads)
+    assert reader.num_steps == len(results.saved_time)
+    for j, (step, t) in enumerate(results.saved_time):
+      time, point_data, cell_data = reader.read_data(j)
+      assert time == t
+      assert np.allclose(point_data["PoreWaterPressure"], results.getSnapshot("PoreWaterPressure", time=t))
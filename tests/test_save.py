@@ -0,0 +1,55 @@
+import os
+import zipfile
+import pytest
+
+import PyGeoStudio as pgs
+import PyGeoStudio.Archive as archive_module
+
+
+def memberCRCs(f):
+  with zipfile.ZipFile(f) as z:
+    return {x.filename:(x.CRC, x.file_size) for x in z.infolist() if not x.filename.endswith(".xml")}
+
+
+@pytest.mark.parametrize("raw_copy", [True, False])
+def test_saveas_copy_members(rapid_drawdown, tmp_path, monkeypatch, raw_copy):
+  if not raw_copy:
+    monkeypatch.setattr(archive_module, "canWriteRawMember", lambda zip_out: False)
+  f_out = str(tmp_path / "copy" / "Rapid drawdown.gsz")
+  os.makedirs(os.path.dirname(f_out))
+  with pgs.GeoStudioFile(rapid_drawdown) as geofile:
+    geofile.saveAs(f_out)
+  with zipfile.ZipFile(f_out) as z:
+    assert z.testzip() is None
+  assert memberCRCs(f_out) == memberCRCs(rapid_drawdown)
+
+
+def test_save_in_place(rapid_drawdown):
+  before = memberCRCs(rapid_drawdown)
+  geofile = pgs.GeoStudioFile(rapid_drawdown)
+  geofile.save()
+  with zipfile.ZipFile(rapid_drawdown) as z:
+    assert z.testzip() is None
+  assert memberCRCs(rapid_drawdown) == before
+  T, PWP = geofile.getAnalysisByID(2)["Results"].getVariablesVsTime("PoreWaterPressure", [[25,2]])
+  assert len(T) == 10
+
+
+@pytest.mark.skipif(os.name == "nt", reason="POSIX permissions")
+def test_save_keeps_permissions(rapid_drawdown):
+  os.chmod(rapid_drawdown, 0o640)
+  pgs.GeoStudioFile(rapid_drawdown).save()
+  assert os.stat(rapid_drawdown).st_mode & 0o777 == 0o640
+
+
+@pytest.mark.skipif(os.name == "nt", reason="POSIX permissions")
+def test_saveas_default_permissions(rapid_drawdown, tmp_path):
+  umask = os.umask(0o027)
+  try:
+    f_out = str(tmp_path / "new" / "Rapid drawdown.gsz")
+    os.makedirs(os.path.dirname(f_out))
+    pgs.GeoStudioFile(rapid_drawdown).saveAs(f_out)
+  finally:
+    os.umask(umask)
+  assert os.stat(f_out).st_mode & 0o777 == 0o640
+  assert os.listdir(os.path.dirname(f_out)) == ["Rapid drawdown.gsz"]
@@ -0,0 +1,56 @@
+import csv
+import io
+import zipfile
+import numpy as np
+import pytest
+
+import PyGeoStudio as pgs
+from PyGeoStudio.SlopeResults import FOS_ERROR_CODE
+
+
+def readMinimumFOS(f, analysis, step):
+  """
+  Return the minimum factor of safety of a step read with the csv module.
+  """
+  folder = analysis.replace('/','&3')
+  with zipfile.ZipFile(f) as z:
+    rows = list(csv.DictReader(io.StringIO(z.read(f"{folder}/{step:0>3d}/slip_surface.csv").decode())))
+  fos = [(float(x["SlipFOS"]), int(float(x["SlipNum"]))) for x in rows if float(x["SlipFOS"]) < FOS_ERROR_CODE]
+  return min(fos)
+
+
+@pytest.mark.parametrize("study", ["rapid_drawdown", "anchors"])
+def test_critical_fos(study, request):
+  f = request.getfixturevalue(study)
+  table = pgs.GeoStudioFile.getCriticalFOS([f])
+  geofile = pgs.GeoStudioFile(f)
+  slope_analyses = [x["Name"] for x in geofile.analyses if x["Kind"] == "SLOPE/W"]
+  assert sorted(set(table["Analysis"])) == sorted(slope_analyses)
+  for row in table:
+    slope_results = geofile.getAnalysisByName(str(row["Analysis"]))["SlopeResults"]
+    slip_num, fos = slope_results.getCriticalSlipSurface(int(row["Step"]))
+    assert (slip_num, fos) == (row["SlipNum"], row["FOS"])
+    assert fos == pytest.approx(readMinimumFOS(f, str(row["Analysis"]), int(row["Step"]))[0])
+    slips = slope_results.getSlipSurfaces(int(row["Step"]))
+    assert fos == slips["SlipFOS"][slips["SlipNum"] == slip_num][0]
+
+
+def test_critical_fos_concurrent(rapid_drawdown, anchors):
+  files = [rapid_drawdown, anchors]
+  ref = pgs.GeoStudioFile.getCriticalFOS(files, n_workers=1)
+  table = pgs.GeoStudioFile.getCriticalFOS(files, n_workers=2)
+  assert np.array_equal(table[["File", "Analysis", "Step", "SlipNum"]], ref[["File", "Analysis", "Step", "SlipNum"]])
+  assert np.array_equal(table["FOS"], ref["FOS"])
+  last = pgs.GeoStudioFile.getCriticalFOS(files, last_step_only=True)
+  assert len(last) == len(set(ref["Analysis"]))
+
+
+def test_slip_data(rapid_drawdown):
+  slope_results = pgs.GeoStudioFile(rapid_drawdown).getAnalysisByName("2a - Stability after rapid drawdown")["SlopeResults"]
+  assert len(slope_results.getStepTimes()) == len(slope_results.getSteps())
+  slip_num, fos = slope_results.getCriticalSlipSurface()
+  assert slip_num in slope_results.getSlipDataSurfaces()
+  columns = slope_results.getSlipData("column")
+  assert len(columns) > 0
+  with pytest.raises(ValueError):
+    slope_results.getSlipData("unknown")
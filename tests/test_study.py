@@ -0,0 +1,99 @@
+import os
+import numpy as np
+import pytest
+
+import PyGeoStudio as pgs
+from conftest import STUDY_DIR
+
+
+def asPlain(obj):
+  """
+  Convert PyGeoStudio objects to nested builtin types.
+  """
+  if isinstance(obj, dict):
+    return {k:asPlain(v) for k,v in obj.items()}
+  if isinstance(obj, (list, tuple)):
+    return [asPlain(x) for x in obj]
+  if isinstance(obj, np.ndarray):
+    return obj.tolist()
+  if hasattr(obj, "data"):
+    return asPlain(obj.data)
+  return str(obj)
+
+
+def describe(geofile):
+  """
+  Return the content of the sections of a study in comparable form.
+  """
+  res = {}
+  res["Analyses"] = [(x["ID"], x["Name"], x["Kind"], x["GeometryId"]) for x in geofile.analyses]
+  res["Materials"] = asPlain(geofile.materials)
+  res["Reinforcements"] = asPlain(geofile.reinforcements)
+  res["Functions"] = asPlain(geofile["Functions"])
+  res["Meshes"] = [(x.points, x.element_offsets, x.element_nodes) for x in geofile.meshes]
+  return res
+
+
+@pytest.mark.parametrize("name", ["Rapid drawdown.gsz", "1D_unsaturated_column.gsz", "Reinforcement with Anchors.gsz"])
+def test_lazy_sections(name):
+  eager = pgs.GeoStudioFile(f"{STUDY_DIR}/{name}")
+  lazy = pgs.GeoStudioFile(f"{STUDY_DIR}/{name}", lazy=True)
+  assert lazy.sections == {}
+  ref, res = describe(eager), describe(lazy)
+  for key in ["Analyses", "Materials", "Reinforcements", "Functions"]:
+    assert res[key] == ref[key]
+  assert len(res["Meshes"]) == len(ref["Meshes"])
+  for arrays, ref_arrays in zip(res["Meshes"], ref["Meshes"]):
+    for arr, ref_arr in zip(arrays, ref_arrays):
+      assert np.array_equal(arr, ref_arr)
+
+
+def readEverything(geofile):
+  for analysis in geofile.analyses:
+    analysis["Name"], analysis["Kind"], analysis["Geometry"], analysis["Context"]
+  for mat in geofile.materials:
+    mat["Name"], mat["SeepModel"], mat["Hydraulic"]
+  for fun in geofile["Functions"]:
+    fun["Name"], fun["Points"]
+  for geom in geofile.geometries:
+    geom.mesh
+
+
+def test_not_modified_after_getters(rapid_drawdown):
+  geofile = pgs.GeoStudioFile(rapid_drawdown)
+  readEverything(geofile)
+  for tag in geofile.sections:
+    assert not geofile.__isSectionModified__(tag), tag
+  geofile.getMaterialByName("Toe drain").setSaturatedHydraulicConductivity(2e-5)
+  assert geofile.getMaterialByName("Toe drain").isModified()
+  assert not geofile.getMaterialByName("Dam fill").isModified()
+  assert geofile.__isSectionModified__("Materials")
+  assert not geofile.__isSectionModified__("Analyses")
+
+
+def test_not_modified_after_save(rapid_drawdown):
+  with pgs.GeoStudioFile(rapid_drawdown) as geofile:
+    geofile.getMaterialByName("Dam fill").setSaturatedHydraulicConductivity(1e-6)
+    geofile.save()
+  geofile = pgs.GeoStudioFile(rapid_drawdown)
+  readEverything(geofile)
+  for tag in geofile.sections:
+    assert not geofile.__isSectionModified__(tag), tag
+  KFn = geofile.getMaterialByName("Dam fill")["Hydraulic"]["KFn"]
+  assert not KFn.isModified()
+  assert KFn.getYData()[0] == pytest.approx(1e-6)
+
+
+def test_raw_property_edited_in_place(rapid_drawdown, tmp_path):
+  f_out = str(tmp_path / "copy" / "Rapid drawdown.gsz")
+  os.makedirs(os.path.dirname(f_out))
+  geofile = pgs.GeoStudioFile(rapid_drawdown)
+  context = geofile.contexts[0]
+  with pytest.warns(UserWarning, match="not officially handled"):
+    bcs = context["GeometryUsesHydraulicBCs"]
+  key = list(bcs.keys())[0]
+  bcs[key] = 999
+  assert context.isModified()
+  geofile.saveAs(f_out)
+  with pytest.warns(UserWarning, match="not officially handled"):
+    assert pgs.GeoStudioFile(f_out).contexts[0]["GeometryUsesHydraulicBCs"][key] == 999
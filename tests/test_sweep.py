@@ -0,0 +1,82 @@
+import os
+import sys
+import numpy as np
+import pytest
+
+import PyGeoStudio as pgs
+
+
+SOLVER = """
+import re, sys, time
+case = int(re.search(r"case_(\\d+)", sys.argv[1]).group(1))
+if case in {failing}:
+  sys.exit(3)
+time.sleep(0.2 * ({n_cases} - case))
+"""
+
+
+def writeSolver(tmp_path, n_cases, failing=()):
+  """
+  Write a stand-in solver which fails for the given cases and finishes the last cases first.
+  """
+  f_solver = tmp_path / "solver.py"
+  f_solver.write_text(SOLVER.format(n_cases=n_cases, failing=set(failing) or "set()"))
+  return [sys.executable, str(f_solver)]
+
+
+def setup(geofile, Ksat):
+  if Ksat is None:
+    raise ValueError("No conductivity")
+  geofile.getMaterialByName("Toe drain").setSaturatedHydraulicConductivity(Ksat)
+
+
+def extract(geofile):
+  return [geofile.getMaterialByName("Toe drain")["Hydraulic"]["KSat"]]
+
+
+def test_cases_in_own_copy(rapid_drawdown, tmp_path):
+  with open(rapid_drawdown, 'rb') as f:
+    base = f.read()
+  Ksats = [1e-5, 2e-5, 3e-5]
+  sweep = pgs.ParametricSweep(rapid_drawdown, str(tmp_path / "sweep"), n_workers=2, solver=writeSolver(tmp_path, 3))
+  table = sweep.run(Ksats, setup, extract)
+  with open(rapid_drawdown, 'rb') as f:
+    assert f.read() == base
+  assert len(set(sweep.files)) == 3
+  for case, f_case in enumerate(sweep.files):
+    assert os.path.isfile(f_case)
+    assert f_case == sweep.getCaseFile(case)
+    assert os.path.basename(f_case) == os.path.basename(rapid_drawdown)
+  assert np.all(table["ReturnCode"] == 0)
+  assert np.allclose(table["Value"][:,0], Ksats)
+
+
+def test_failing_case(rapid_drawdown, tmp_path):
+  sweep = pgs.ParametricSweep(rapid_drawdown, str(tmp_path / "sweep"), n_workers=2, solver=writeSolver(tmp_path, 3, failing=[1]))
+  with pytest.warns(UserWarning, match="Solver failed for case 1"):
+    table = sweep.run([1e-5, 2e-5, 3e-5], setup, extract)
+  assert list(table["ReturnCode"]) == [0, 3, 0]
+  assert np.isnan(table["Value"][1,0])
+  assert np.allclose(table["Value"][[0,2],0], [1e-5, 3e-5])
+
+
+def test_failing_setup(rapid_drawdown, tmp_path):
+  sweep = pgs.ParametricSweep(rapid_drawdown, str(tmp_path / "sweep"), n_workers=2, solver=writeSolver(tmp_path, 3))
+  with pytest.warns(UserWarning, match="Setup failed for case 0"):
+    table = sweep.run([None, 2e-5, 3e-5], setup, extract)
+  assert list(table["ReturnCode"]) == [-1, 0, 0]
+  assert np.isnan(table["Value"][0,0])
+  assert np.allclose(table["Value"][1:,0], [2e-5, 3e-5])
+
+
+def test_order_of_parameters(rapid_drawdown, tmp_path):
+  Ksats = [1e-5, 2e-5, 3e-5, 4e-5]
+  sweep = pgs.ParametricSweep(rapid_drawdown, str(tmp_path / "sweep"), n_workers=4, solver=writeSolver(tmp_path, 4))
+  finished = []
+  def extractOrder(geofile):
+    finished.append(geofile.f_src)
+    return extract(geofile)
+  table = sweep.run(Ksats, setup, extractOrder)
+  assert finished != sweep.files #the last cases finished first
+  assert list(table["Case"]) == [0, 1, 2, 3]
+  assert np.allclose(table["Value"][:,0], Ksats)